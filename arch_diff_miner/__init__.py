@@ -6,6 +6,8 @@ from .cli import (
     DEFAULT_CODE_EXTENSIONS,
     DEFAULT_CONTEXT_DAYS,
     DEFAULT_OUTPUT_PATH,
+    DEFAULT_SORT_ORDER,
+    DEFAULT_WORKERS,
     MineConfig,
     TrainingSample,
     app,
@@ -20,6 +22,8 @@ __all__ = [
     "DEFAULT_CODE_EXTENSIONS",
     "DEFAULT_CONTEXT_DAYS",
     "DEFAULT_OUTPUT_PATH",
+    "DEFAULT_SORT_ORDER",
+    "DEFAULT_WORKERS",
     "MineConfig",
     "TrainingSample",
     "app",
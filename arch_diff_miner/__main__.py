@@ -1,5 +1,7 @@
 """Enable `python -m arch_diff_miner`."""
+import sys
+
 from .cli import main
 
 if __name__ == "__main__":  # pragma: no cover - module entry
-    main()
+    sys.exit(main())
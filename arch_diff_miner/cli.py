@@ -1,12 +1,19 @@
 """Arch Diff Miner Typer CLI."""
 from __future__ import annotations
 
+import contextlib
+import functools
+import itertools
 import logging
+import multiprocessing
+import os
 import sys
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 from typing import TypedDict
 
 import pygit2
@@ -22,8 +29,8 @@ except ImportError:  # pragma: no cover - fallback for older pygit2
 
 import typer
 
-from .jsonl_writer import write_jsonl_dataset
-from .context import collect_context_stats
+from .jsonl_writer import ContextSignals, write_jsonl_dataset
+from .context import DeltaLookup, collect_context_stats, make_delta_lookup
 
 
 class TrainingSample(TypedDict):
@@ -52,11 +59,31 @@ class MineConfig:
     adl_file: str
     code_extensions: Sequence[str]
     context_days: int
+    include_hunk_context: bool = True
+    workers: int = 1
+    detect_renames: bool = True
+    since: Optional[datetime] = None
+    max_samples: Optional[int] = None
+    sort_order: str = "none"
 
 
 DEFAULT_ADL_FILE = "adl.yaml"
 DEFAULT_CODE_EXTENSIONS = (".py",)
 DEFAULT_CONTEXT_DAYS = 90
+DEFAULT_WORKERS = 1
+DEFAULT_SORT_ORDER = "none"
+# The walk follows first parents only, so both modes yield the same
+# newest-first chain; "topological" just costs a full-history pre-pass.
+# GIT_SORT_TIME is not offered: it reorders commits sharing a timestamp,
+# which breaks ADL rename tracking.
+_SORT_ORDERS = {
+    "none": pygit2.GIT_SORT_NONE,
+    "topological": pygit2.GIT_SORT_TOPOLOGICAL,
+}
+# Commits handed to each pool worker per IPC round trip.
+PARALLEL_CHUNKSIZE = 16
+# Batches kept in flight per worker; bounds wasted work when mining stops early.
+PARALLEL_WINDOW_PER_WORKER = 2
 # None indicates stdout per SPEC v1; callers can still supply a file path explicitly.
 DEFAULT_OUTPUT_PATH: Optional[Path] = None
 CODE_EXTS_FLAG_NAMES = ("--code-exts", "-c")
@@ -161,6 +188,36 @@ def _normalize_extensions(exts: Sequence[str]) -> Tuple[str, ...]:
     return tuple(dict.fromkeys(cleaned)) or DEFAULT_CODE_EXTENSIONS
 
 
+@functools.lru_cache(maxsize=None)
+def _extension_matcher(ext_tuple: Tuple[str, ...]) -> Callable[[str], bool]:
+    """Return a predicate testing lowercased paths against ``ext_tuple``.
+
+    Single-dot extensions resolve with one ``rfind`` and a frozenset lookup, so
+    the cost stays flat as more extensions are configured. Compound extensions
+    such as ``.d.ts`` fall back to ``str.endswith``. Matchers are cached per
+    extension tuple, so a run builds its frozenset once rather than per commit.
+    """
+    if any("." in ext[1:] for ext in ext_tuple):
+        return lambda path: path.endswith(ext_tuple)
+
+    ext_set = frozenset(ext_tuple)
+
+    def _matches(path: str) -> bool:
+        dot = path.rfind(".")
+        return dot != -1 and path[dot:] in ext_set
+
+    return _matches
+
+
+def _validate_sort_order(value: str) -> str:
+    """Ensure the sort-order CLI flag names a supported walker mode."""
+    normalized = value.strip().lower()
+    if normalized not in _SORT_ORDERS:
+        choices = ", ".join(_SORT_ORDERS)
+        raise typer.BadParameter(f"--sort-order must be one of: {choices}.")
+    return normalized
+
+
 def _validate_context_days(value: int) -> int:
     """Ensure the context-days CLI flag is a positive integer."""
     if value < 1:
@@ -202,8 +259,9 @@ def _patch_text(
         logger.warning("Binary diff detected for %s '%s'; skipping.", kind, path)
         return ""
 
-    if not text.strip():
-        # Blank patches generally mean pure mode/rename changes.
+    if not text or text.isspace():
+        # Blank patches generally mean pure mode/rename changes. isspace()
+        # answers in C without copying the patch like strip() would.
         return ""
 
     return text
@@ -220,66 +278,95 @@ def _delta_status_name(delta_status: int) -> str:
     return mapping.get(delta_status, "unknown")
 
 
-def _extract_hunks(patch_text: str) -> List[Dict[str, Any]]:
-    """Parse unified diff text into structured hunks."""
+def _extract_hunks(patch_text: str, include_context: bool = True) -> List[Dict[str, Any]]:
+    """Parse unified diff text into structured hunks.
+
+    Args:
+        patch_text: Unified diff text for a single file.
+        include_context: When False, context lines are not retained and each
+            hunk carries an empty ``context`` list.
+
+    Returns:
+        Hunk dicts with ``header``, ``added``, ``removed``, and ``context``.
+    """
     if not patch_text:
         return []
 
+    # Jump straight to the first hunk header; file headers ("---", "+++",
+    # "index ...") never need per-line classification. Skipping by line count
+    # avoids copying the patch body with a string slice.
+    if patch_text.startswith("@@"):
+        header_lines = 0
+    else:
+        start = patch_text.find("\n@@") + 1
+        if not start:
+            return []
+        header_lines = patch_text.count("\n", 0, start)
+
     hunks: List[Dict[str, Any]] = []
-    current: Optional[Dict[str, Any]] = None
+    added: List[str] = []
+    removed: List[str] = []
+    context: List[str] = []
+
+    # Dispatch on the first character only, most frequent prefixes first.
+    for line in itertools.islice(patch_text.splitlines(), header_lines, None):
+        tag = line[:1]
+        if tag == " ":
+            if include_context:
+                context.append(line[1:])
+        elif tag == "+":
+            added.append(line[1:])
+        elif tag == "-":
+            removed.append(line[1:])
+        elif tag == "@" and line.startswith("@@"):
+            added, removed, context = [], [], []
+            hunks.append(
+                {"header": line, "added": added, "removed": removed, "context": context}
+            )
+        elif include_context:
+            context.append(line)
 
-    for line in patch_text.splitlines():
-        if line.startswith("@@"):
-            if current:
-                hunks.append(current)
-            current = {"header": line, "added": [], "removed": [], "context": []}
-            continue
+    return hunks
 
-        if current is None:
-            # Skip diff headers
-            continue
 
-        if line.startswith("+"):
-            current["added"].append(line[1:])
-        elif line.startswith("-"):
-            current["removed"].append(line[1:])
-        elif line.startswith(" "):
-            current["context"].append(line[1:])
-        else:
-            current["context"].append(line)
+def _stats_from_hunks(hunks: Sequence[Dict[str, Any]]) -> Dict[str, int]:
+    """Return additions/deletions counts from already-parsed hunks."""
+    return {
+        "additions": sum(len(hunk["added"]) for hunk in hunks),
+        "deletions": sum(len(hunk["removed"]) for hunk in hunks),
+    }
 
-    if current:
-        hunks.append(current)
 
-    return hunks
+def _patch_stats(patch: pygit2.Patch, hunks: Sequence[Dict[str, Any]]) -> Dict[str, int]:
+    """Return additions/deletions, preferring libgit2's precomputed line stats."""
+    if not hunks:
+        return {"additions": 0, "deletions": 0}
+    try:
+        _, additions, deletions = patch.line_stats
+    except (AttributeError, pygit2.GitError):  # pragma: no cover - defensive
+        return _stats_from_hunks(hunks)
+    return {"additions": additions, "deletions": deletions}
 
 
-def _count_stats_from_text(patch_text: str) -> Dict[str, int]:
-    """Return additions/deletions counts for a diff text."""
-    adds = 0
-    dels = 0
-    for line in patch_text.splitlines():
-        if line.startswith("@@") or line.startswith("---") or line.startswith("+++"):
-            continue
-        if line.startswith("+"):
-            adds += 1
-        elif line.startswith("-"):
-            dels += 1
-    return {"additions": adds, "deletions": dels}
+@functools.lru_cache(maxsize=4096)
+def _utc_isoformat(epoch_seconds: int) -> str:
+    """Format whole epoch seconds as ``YYYY-MM-DDTHH:MM:SSZ``."""
+    return datetime.fromtimestamp(epoch_seconds, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
 
 def _format_timestamp(signature: pygit2.Signature) -> str:
-    """Convert a pygit2 signature timestamp into an ISO-8601 UTC string."""
-    tz = timezone(timedelta(minutes=signature.offset))
-    dt = datetime.fromtimestamp(signature.time, tz)
-    return dt.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+    """Convert a pygit2 signature timestamp into an ISO-8601 UTC string.
+
+    ``signature.time`` is already UTC epoch seconds, so the author's offset
+    never affects the output; commits made together share cached strings.
+    """
+    return _utc_isoformat(signature.time)
 
 
 def _signature_datetime(signature: pygit2.Signature) -> datetime:
     """Return a timezone-aware datetime for additional computations."""
 
-    tz = timezone(timedelta(minutes=signature.offset))
-    return datetime.fromtimestamp(signature.time, tz).astimezone(timezone.utc)
+    return datetime.fromtimestamp(signature.time, timezone.utc)
 
 
 class _AdlDiffResult(TypedDict, total=False):
@@ -292,98 +379,308 @@ class _AdlDiffResult(TypedDict, total=False):
     stats: Dict[str, int]
 
 
-def _collect_commit_diffs(
+# Shared options for every commit diff. GIT_DIFF_SKIP_BINARY_CHECK is left
+# out on purpose: binary patches must still be detected and skipped.
+_DIFF_KWARGS: Dict[str, int] = {
+    "context_lines": 3,
+    "interhunk_lines": 1,
+    "flags": pygit2.GIT_DIFF_INCLUDE_TYPECHANGE,
+}
+
+
+def _commit_diff(
     repo: pygit2.Repository,
     parent_tree: pygit2.Tree,
     current_tree: pygit2.Tree,
-    tracked_adl_path: str,
-    code_extensions: Sequence[str],
-) -> Tuple[_AdlDiffResult, List[Dict[str, Any]]]:
-    """Return ADL diff metadata and filtered code diffs for the commit."""
+    detect_renames: bool = True,
+) -> Optional[pygit2.Diff]:
+    """Return the tree diff used for ADL and code extraction.
+
+    With ``detect_renames`` the diff pairs renamed files; copies and rewrites
+    are never searched for.
+    """
     try:
-        diff = repo.diff(
-            parent_tree,
-            current_tree,
-            context_lines=3,
-            interhunk_lines=1,
-            flags=pygit2.GIT_DIFF_INCLUDE_TYPECHANGE,
-        )
+        diff = repo.diff(parent_tree, current_tree, **_DIFF_KWARGS)
     except pygit2.GitError as error:
         logger.error("Could not compute diff for commit: %s", error)
-        return {"touched": False}, []
+        return None
 
+    if not detect_renames:
+        return diff
     try:
-        diff.find_similar(rename_threshold=60)
+        diff.find_similar(flags=pygit2.GIT_DIFF_FIND_RENAMES, rename_threshold=60)
     except AttributeError:  # pragma: no cover - older pygit2
         pass
+    return diff
+
+
+def _tree_entry_id(tree: pygit2.Tree, path: str) -> Optional[pygit2.Oid]:
+    """Return the object id stored at ``path`` in ``tree``, or None if absent."""
+    try:
+        return tree[path].id
+    except (KeyError, ValueError):
+        return None
+
+
+def _adl_unchanged(
+    parent_tree: pygit2.Tree, current_tree: pygit2.Tree, tracked_adl_path: str
+) -> bool:
+    """Return True when both trees hold the same ADL blob at ``tracked_adl_path``.
+
+    Two path lookups are far cheaper than a full tree diff. A missing entry is
+    not treated as unchanged because ADL matching is case-insensitive and the
+    file may have been renamed, so those commits still take the diff path.
+    Identical trees (empty commits, merges keeping the first parent's tree)
+    are unchanged without any lookup.
+    """
+    if parent_tree.id == current_tree.id:
+        return True
+    parent_id = _tree_entry_id(parent_tree, tracked_adl_path)
+    return parent_id is not None and parent_id == _tree_entry_id(
+        current_tree, tracked_adl_path
+    )
+
+
+def _adl_rename_match(
+    repo: pygit2.Repository,
+    parent_tree: pygit2.Tree,
+    current_tree: pygit2.Tree,
+    tracked_lower: str,
+) -> Optional[Tuple[pygit2.Diff, int, pygit2.DiffDelta]]:
+    """Return (diff, index, delta) when the tracked ADL was renamed in.
+
+    Used when rename detection is off for code diffs: the ADL then shows up as
+    an added file, so only those commits pay for a similarity search and the
+    ADL history is still followed across moves.
+    """
+    diff = _commit_diff(repo, parent_tree, current_tree, detect_renames=True)
+    if diff is None:
+        return None
+    for idx, delta in enumerate(diff.deltas):
+        if (
+            delta.status == GIT_DELTA_RENAMED
+            and _clean_rel_path(delta.new_file.path or "").lower() == tracked_lower
+        ):
+            return diff, idx, delta
+    return None
+
+
+def _adl_touch(
+    repo: pygit2.Repository,
+    parent_tree: pygit2.Tree,
+    current_tree: pygit2.Tree,
+    tracked_adl_path: str,
+    detect_renames: bool = True,
+) -> Tuple[bool, Optional[str]]:
+    """Report whether a commit touches the ADL, using delta metadata only.
+
+    Returns:
+        Tuple of (touched, previous_path) where previous_path is set when the
+        ADL was renamed into the tracked path by this commit.
+    """
+    if _adl_unchanged(parent_tree, current_tree, tracked_adl_path):
+        return False, None
+    diff = _commit_diff(repo, parent_tree, current_tree, detect_renames)
+    if diff is None:
+        return False, None
+
+    tracked_lower = tracked_adl_path.lower()
+    for delta in diff.deltas:
+        path_new = _clean_rel_path(delta.new_file.path or "")
+        path_old = _clean_rel_path(delta.old_file.path or "")
+        if (path_new or path_old).lower() == tracked_lower:
+            if delta.status == GIT_DELTA_ADDED and not detect_renames:
+                match = _adl_rename_match(repo, parent_tree, current_tree, tracked_lower)
+                if match is not None:
+                    return True, _clean_rel_path(match[2].old_file.path or "")
+            renamed = delta.status == GIT_DELTA_RENAMED
+            return True, path_old if renamed else None
+    return False, None
+
+
+_ParsedPatch = Tuple[List[Dict[str, Any]], Dict[str, int]]
+# (header, added, removed, context) with immutable line tuples.
+_FrozenHunk = Tuple[str, Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]
+# (hunks, additions, deletions) as stored in the patch cache.
+_FrozenPatch = Tuple[Tuple[_FrozenHunk, ...], int, int]
+_PatchKey = Tuple[bytes, bytes, str, bool]
+# Upper bound on cached hunk text (characters) per run.
+PATCH_CACHE_MAX_CHARS = 32 * 1024 * 1024
+
+
+class _PatchCache:
+    """Per-run LRU of parsed code patches, bounded by cached hunk text size.
+
+    Keys are (old blob OID, new blob OID, path, include_context). Blob OIDs
+    pin the contents; the path is part of the key because `.gitattributes`
+    diff drivers and binary rules can render the same blobs differently per
+    path. Values are immutable, so hits are shared without defensive copies.
+    """
+
+    def __init__(self, max_chars: int = PATCH_CACHE_MAX_CHARS) -> None:
+        # key -> (frozen patch, cached text size)
+        self._entries: "OrderedDict[_PatchKey, Tuple[_FrozenPatch, int]]" = OrderedDict()
+        self._max_chars = max_chars
+        self._chars = 0
+
+    def get(self, key: _PatchKey) -> Optional[_FrozenPatch]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: _PatchKey, value: _FrozenPatch) -> None:
+        size = sum(
+            len(header) + sum(map(len, itertools.chain(added, removed, context)))
+            for header, added, removed, context in value[0]
+        )
+        if size > self._max_chars:
+            return
+        self._entries[key] = (value, size)
+        self._chars += size
+        while self._chars > self._max_chars:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._chars -= evicted
+
+
+def _freeze_hunks(hunks: Sequence[Dict[str, Any]]) -> Tuple[_FrozenHunk, ...]:
+    """Convert parsed hunk dicts into the cache's immutable form."""
+    return tuple(
+        (hunk["header"], tuple(hunk["added"]), tuple(hunk["removed"]), tuple(hunk["context"]))
+        for hunk in hunks
+    )
+
+
+def _thaw_hunks(hunks: Tuple[_FrozenHunk, ...]) -> List[Dict[str, Any]]:
+    """Build record-ready hunk dicts from cached immutable hunks."""
+    return [
+        {
+            "header": header,
+            "added": list(added),
+            "removed": list(removed),
+            "context": list(context),
+        }
+        for header, added, removed, context in hunks
+    ]
+
+
+def _code_patch(
+    diff: pygit2.Diff,
+    idx: int,
+    delta: pygit2.DiffDelta,
+    path: str,
+    include_context: bool,
+    patch_cache: Optional[_PatchCache] = None,
+) -> _ParsedPatch:
+    """Return (hunks, stats) for a code delta, reusing identical blob pairs.
+
+    Rebased and cherry-picked commits repeat the same blob transitions, so
+    their patches are only generated and parsed once per run. Record dicts
+    are built from the cached tuples, so records never share mutable state.
+    """
+    key = (delta.old_file.id.raw, delta.new_file.id.raw, path, include_context)
+    cached = patch_cache.get(key) if patch_cache is not None else None
+    if cached is not None:
+        frozen_hunks, additions, deletions = cached
+        return _thaw_hunks(frozen_hunks), {"additions": additions, "deletions": deletions}
+
+    patch = diff[idx]
+    hunks = _extract_hunks(_patch_text(patch, path, "code"), include_context)
+    stats = _patch_stats(patch, hunks)
+    if patch_cache is not None and hunks:
+        patch_cache.put(key, (_freeze_hunks(hunks), stats["additions"], stats["deletions"]))
+    return hunks, stats
+
+
+def _collect_commit_diffs(
+    repo: pygit2.Repository,
+    parent_tree: pygit2.Tree,
+    current_tree: pygit2.Tree,
+    tracked_adl_path: str,
+    code_extensions: Sequence[str],
+    include_context: bool = True,
+    detect_renames: bool = True,
+    patch_cache: Optional[_PatchCache] = None,
+) -> Tuple[_AdlDiffResult, List[Dict[str, Any]]]:
+    """Return ADL diff metadata and filtered code diffs for the commit."""
+    diff = _commit_diff(repo, parent_tree, current_tree, detect_renames)
+    if diff is None:
+        return {"touched": False}, []
 
     tracked_lower = tracked_adl_path.lower()
+    has_code_extension = _extension_matcher(tuple(code_extensions))
     adl_result: _AdlDiffResult = {"touched": False}
     code_diffs: List[Dict[str, Any]] = []
 
-    for patch in diff:
-        delta = patch.delta
+    # Filter on delta metadata first; libgit2 only formats patches for the
+    # deltas that survive (``diff[idx]``), which skips most of the tree.
+    for idx, delta in enumerate(diff.deltas):
         path_new = _clean_rel_path(delta.new_file.path or "")
         path_old = _clean_rel_path(delta.old_file.path or "")
-        normalized_new = path_new.lower()
-        normalized_old = path_old.lower()
-
-        # Determine if this patch corresponds to the tracked ADL path.
-        is_adl_patch = (
-            normalized_new == tracked_lower
-            or (not path_new and normalized_old == tracked_lower)
-            or (
-                delta.status == GIT_DELTA_RENAMED
-                and normalized_new == tracked_lower
-            )
-        )
+        candidate_path = path_new or path_old
+        if not candidate_path:
+            continue
+        # Lower-case once per delta; both the ADL and extension checks use it.
+        normalized_candidate = candidate_path.lower()
+        status = delta.status
+        # Pure renames and mode changes keep the blob; there is no text to diff.
+        content_changed = delta.old_file.id != delta.new_file.id
 
-        if is_adl_patch and not adl_result.get("touched"):
-            adl_patch_text = _patch_text(patch, path_new or path_old, "ADL")
+        if normalized_candidate == tracked_lower:
+            if adl_result.get("touched"):
+                continue
+            adl_diff, adl_idx = diff, idx
+            if status == GIT_DELTA_ADDED and not detect_renames:
+                match = _adl_rename_match(repo, parent_tree, current_tree, tracked_lower)
+                if match is not None:
+                    adl_diff, adl_idx, delta = match
+                    path_old = _clean_rel_path(delta.old_file.path or "")
+                    status = delta.status
+                    content_changed = delta.old_file.id != delta.new_file.id
+            adl_patch_text = ""
+            adl_hunks: List[Dict[str, Any]] = []
+            adl_stats = {"additions": 0, "deletions": 0}
+            if content_changed:
+                adl_patch = adl_diff[adl_idx]
+                adl_patch_text = _patch_text(adl_patch, candidate_path, "ADL")
+                adl_hunks = _extract_hunks(adl_patch_text, include_context)
+                adl_stats = _patch_stats(adl_patch, adl_hunks)
+            # Still report the touch so renames update the tracked path.
             adl_result = {
                 "patch_text": adl_patch_text,
-                "status": _delta_status_name(delta.status),
-                "current_path": path_new or path_old,
-                "previous_path": path_old if delta.status == GIT_DELTA_RENAMED else None,
+                "status": _delta_status_name(status),
+                "current_path": candidate_path,
+                "previous_path": path_old if status == GIT_DELTA_RENAMED else None,
                 "touched": True,
-                "hunks": _extract_hunks(adl_patch_text),
-                "stats": _count_stats_from_text(adl_patch_text),
+                "hunks": adl_hunks,
+                "stats": adl_stats,
             }
             continue
 
-        # Otherwise, treat as a potential code diff.
-        candidate_path = path_new or path_old
-        if not candidate_path:
-            continue
-        normalized_candidate = candidate_path.lower()
-        if normalized_candidate == tracked_lower:
-            continue
-        if not any(normalized_candidate.endswith(ext) for ext in code_extensions):
+        if not content_changed or not has_code_extension(normalized_candidate):
             continue
 
-        patch_text = _patch_text(patch, candidate_path, "code")
-        hunks = _extract_hunks(patch_text)
+        hunks, stats = _code_patch(
+            diff, idx, delta, candidate_path, include_context, patch_cache
+        )
         if hunks:
             code_diffs.append(
                 {
                     "path": candidate_path,
-                    "status": _delta_status_name(delta.status),
+                    "status": _delta_status_name(status),
                     "extension": Path(candidate_path).suffix or "",
                     "language": None,
                     "hunks": hunks,
-                    "stats": _count_stats_from_text(patch_text),
+                    "stats": stats,
                 }
             )
 
     return adl_result, code_diffs
 
 
-def _log_sample(training_pairs: List[TrainingSample]) -> None:
+def _log_sample(sample: TrainingSample) -> None:
     """Log the first tuple for quick inspection."""
-    if not training_pairs:
-        return
-
-    sample = training_pairs[0]
     intent = sample["intent_message"]
     code_diffs = sample["code_diffs"]
     adl_diff = sample["adl_diff"]
@@ -415,7 +712,7 @@ def _log_sample(training_pairs: List[TrainingSample]) -> None:
 
 def _write_training_dataset(
     output_path: Optional[Path],
-    training_pairs: List[TrainingSample],
+    training_pairs: Iterable[TrainingSample],
 ) -> Tuple[Optional[Path], int]:
     """Stream samples to stdout or a destination file as JSONL."""
     destination = output_path.expanduser().resolve() if output_path else None
@@ -423,24 +720,307 @@ def _write_training_dataset(
     return destination, written
 
 
+def _process_commit(
+    repo: pygit2.Repository,
+    target_commit: pygit2.Commit,
+    tracked_adl_path: str,
+    code_extensions: Sequence[str],
+    config: MineConfig,
+    delta_lookup: Optional[DeltaLookup] = None,
+    patch_cache: Optional[_PatchCache] = None,
+) -> Tuple[Optional[TrainingSample], Optional[str]]:
+    """Build the training sample for one non-root commit.
+
+    Args:
+        repo: Open pygit2 repository.
+        target_commit: Commit to diff against its first parent.
+        tracked_adl_path: ADL path as named in ``target_commit``'s tree.
+        code_extensions: Normalized code extensions to keep.
+        config: Mining settings (context window, hunk options).
+        delta_lookup: Shared context-diff cache reused across commits.
+        patch_cache: Parsed code-patch cache for the current run.
+
+    Returns:
+        Tuple of (sample or None when filtered, previous ADL path when the
+        commit renamed the ADL file).
+    """
+    parent_commit = target_commit.parents[0]
+    parent_tree = parent_commit.tree
+    current_tree = target_commit.tree
+    if _adl_unchanged(parent_tree, current_tree, tracked_adl_path):
+        return None, None
+
+    # Most commits return above without logging; Oids are passed to logging
+    # as-is so hex formatting only happens when a record is emitted.
+    logger.info("Processing Target Commit (After): %s", target_commit.id)
+    logger.info("           Parent Commit (Before): %s", parent_commit.id)
+
+    adl_result, code_diffs_x1 = _collect_commit_diffs(
+        repo,
+        parent_tree,
+        current_tree,
+        tracked_adl_path,
+        code_extensions,
+        config.include_hunk_context,
+        config.detect_renames,
+        patch_cache,
+    )
+    previous_path = adl_result.get("previous_path")
+
+    if not adl_result.get("touched"):
+        return None, previous_path
+
+    commit_id = str(target_commit.id)
+    parent_id = str(parent_commit.id)
+    is_merge = len(target_commit.parents) > 1
+    adl_hunks = adl_result.get("hunks", [])
+    if not adl_hunks:
+        logger.info(
+            "  -> SKIP: ADL diff empty or non-textual (status=%s)",
+            adl_result.get("status", "unknown"),
+        )
+        return None, previous_path
+
+    if not code_diffs_x1:
+        logger.info(
+            "  -> SKIP: Commit %s touched ADL but has no matching code diffs.",
+            commit_id,
+        )
+        return None, previous_path
+
+    code_paths = [diff_entry["path"] for diff_entry in code_diffs_x1]
+    unique_code_paths = list(dict.fromkeys(code_paths))
+    analysis_until = _signature_datetime(parent_commit.committer)
+    analysis_since = analysis_until - timedelta(days=config.context_days)
+    per_file_stats, aggregate_stats = collect_context_stats(
+        repo=repo,
+        parent_commit=parent_commit,
+        files=unique_code_paths,
+        since_dt=analysis_since,
+        until_dt=analysis_until,
+        delta_lookup=delta_lookup,
+    )
+    per_file_list = [
+        {
+            "path": path,
+            **stats,
+        }
+        for path, stats in per_file_stats.items()
+    ]
+    # Built in the writer's final key order and types, so it is not re-normalized.
+    context_signals = ContextSignals(
+        analysis_parent_hash=parent_id,
+        analysis_timespan_days=config.context_days,
+        files_analyzed=unique_code_paths,
+        aggregate_stats=aggregate_stats,
+        per_file_stats=per_file_list,
+    )
+
+    intent_x2 = (target_commit.message or "").strip()
+
+    author = target_commit.author
+    committer = target_commit.committer
+
+    data_pair: TrainingSample = {
+        "commit_hash": commit_id,
+        "parent_hash": parent_id,
+        "authored_at": _format_timestamp(author),
+        "committed_at": _format_timestamp(committer),
+        "author_name": author.name or "",
+        "author_email": author.email or "",
+        "committer_name": committer.name or author.name or "",
+        "committer_email": committer.email or author.email or "",
+        "is_merge": is_merge,
+        "intent_message": intent_x2,
+        "adl_diff": {
+            "path": adl_result.get("current_path") or tracked_adl_path,
+            "previous_path": previous_path,
+            "status": adl_result.get("status", "modified"),
+            "hunks": adl_hunks,
+            "stats": adl_result.get("stats", {"additions": 0, "deletions": 0}),
+        },
+        "code_diffs": code_diffs_x1,
+        "context_signals": context_signals,
+    }
+    logger.info(
+        "  -> SUCCESS: Found %s code diffs and 1 ADL diff.",
+        len(code_diffs_x1),
+    )
+    return data_pair, previous_path
+
+
+# Per-process repository handle and caches opened by _init_worker.
+_WORKER_REPO: Optional[pygit2.Repository] = None
+_WORKER_DELTA_LOOKUP: Optional[DeltaLookup] = None
+_WORKER_PATCH_CACHE: Optional[_PatchCache] = None
+
+
+def _init_worker(repo_path: str) -> None:
+    """Open the repository (and its diff caches) once per worker process."""
+    global _WORKER_REPO, _WORKER_DELTA_LOOKUP, _WORKER_PATCH_CACHE
+    _WORKER_REPO = pygit2.Repository(repo_path)
+    _WORKER_DELTA_LOOKUP = make_delta_lookup(_WORKER_REPO)
+    _WORKER_PATCH_CACHE = _PatchCache()
+
+
+def _process_commit_in_worker(
+    task: Tuple[str, str, Tuple[str, ...], MineConfig],
+) -> Optional[TrainingSample]:
+    """Worker entry point: rebuild the commit from its SHA and process it."""
+    commit_sha, tracked_adl_path, code_extensions, config = task
+    assert _WORKER_REPO is not None, "worker repository not initialized"
+    target_commit = _WORKER_REPO[commit_sha]
+    sample, _ = _process_commit(
+        _WORKER_REPO,
+        target_commit,
+        tracked_adl_path,
+        code_extensions,
+        config,
+        _WORKER_DELTA_LOOKUP,
+        _WORKER_PATCH_CACHE,
+    )
+    return sample
+
+
+def _iter_adl_candidates(
+    repo: pygit2.Repository,
+    walker: Iterable[pygit2.Commit],
+    tracked_adl_path: str,
+    detect_renames: bool = True,
+) -> Iterator[Tuple[str, str]]:
+    """Yield (commit SHA, tracked ADL path) for commits touching the ADL.
+
+    This cheap first pass only inspects delta metadata, following ADL renames
+    so each candidate carries the path under which its tree names the file.
+    """
+    for target_commit in walker:
+        if not target_commit.parents:
+            logger.info("Skipping root commit %s (no parent).", target_commit.id)
+            continue
+        touched, previous_path = _adl_touch(
+            repo,
+            target_commit.parents[0].tree,
+            target_commit.tree,
+            tracked_adl_path,
+            detect_renames,
+        )
+        if touched:
+            yield str(target_commit.id), tracked_adl_path
+        if previous_path:
+            tracked_adl_path = _normalize_rel_path(previous_path)
+
+
+def _process_batch_in_worker(
+    batch: Sequence[Tuple[str, str, Tuple[str, ...], MineConfig]],
+) -> List[Optional[TrainingSample]]:
+    """Worker entry point for a batch of commits sharing one IPC round trip."""
+    return [_process_commit_in_worker(task) for task in batch]
+
+
+def _mine_in_parallel(
+    repo: pygit2.Repository,
+    walker: Iterable[pygit2.Commit],
+    tracked_adl_path: str,
+    code_extensions: Tuple[str, ...],
+    config: MineConfig,
+) -> Iterator[TrainingSample]:
+    """Process ADL candidates across worker processes, preserving walk order.
+
+    Candidates are submitted in a bounded window (``PARALLEL_WINDOW_PER_WORKER``
+    batches per worker), so closing the generator early, e.g. once
+    ``max_samples`` is reached, cancels queued work instead of draining it.
+    """
+    batch_size = PARALLEL_CHUNKSIZE
+    if config.max_samples is not None:
+        batch_size = min(batch_size, config.max_samples)
+    tasks = (
+        (commit_sha, adl_path, code_extensions, config)
+        for commit_sha, adl_path in _iter_adl_candidates(
+            repo, walker, tracked_adl_path, config.detect_renames
+        )
+    )
+    batches = itertools.batched(tasks, batch_size)
+    first_window = list(
+        itertools.islice(batches, config.workers * PARALLEL_WINDOW_PER_WORKER)
+    )
+    if not first_window:
+        return
+    # Spawned interpreters are costly to start; never start more than needed.
+    max_workers = min(config.workers, sum(len(batch) for batch in first_window))
+    logger.info("Processing ADL commits with %s worker processes.", max_workers)
+    # libgit2 handles are not fork-safe; spawn fresh interpreters instead.
+    executor = ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(repo.path,),
+    )
+    pending = deque(
+        executor.submit(_process_batch_in_worker, batch) for batch in first_window
+    )
+    finished = False
+    try:
+        while pending:
+            results = pending.popleft().result()
+            next_batch = next(batches, None)
+            if next_batch is not None:
+                pending.append(executor.submit(_process_batch_in_worker, next_batch))
+            for sample in results:
+                if sample is not None:
+                    yield sample
+        finished = True
+    finally:
+        # On early exit drop queued batches rather than waiting for them.
+        executor.shutdown(wait=finished, cancel_futures=not finished)
+
+
+def _walk_since(
+    walker: Iterable[pygit2.Commit], since: Optional[datetime]
+) -> Iterator[pygit2.Commit]:
+    """Yield commits until the first one committed before ``since``.
+
+    The first-parent walk is newest-first, so everything after that commit is
+    older still and the walk can stop instead of visiting all of history.
+    """
+    if since is None:
+        yield from walker
+        return
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    since_ts = since.timestamp()
+    for commit in walker:
+        if commit.commit_time < since_ts:
+            logger.info("Reached commits older than %s; stopping walk.", since.isoformat())
+            return
+        yield commit
+
+
 def mine_repository(
     config: MineConfig,
-) -> List[TrainingSample]:
-    """Extract structured samples for commits touching the ADL file."""
+) -> Iterator[TrainingSample]:
+    """Yield structured samples for commits touching the ADL file.
+
+    Samples are produced lazily so callers can stream them to disk without
+    holding the whole dataset in memory. With ``config.workers > 1`` the
+    per-commit work runs in a process pool; output order is unchanged.
+    ``config.since`` stops the walk at older commits and
+    ``config.max_samples`` stops it once that many samples were yielded.
+    """
     repo_path = config.repo_path
     logger.info("Opening repository at: %s", repo_path)
     repo = _discover_repository(repo_path)
     if repo is None:
-        return []
+        return
 
     try:
         head_id = repo.head.target
     except pygit2.GitError:
         logger.error("Repository '%s' has no HEAD.", repo_path)
-        return []
+        return
 
-    walker = repo.walk(head_id, pygit2.GIT_SORT_TOPOLOGICAL)
+    walker = repo.walk(head_id, _SORT_ORDERS[config.sort_order])
     walker.simplify_first_parent()
+    commits = _walk_since(walker, config.since)
 
     normalized_adl_path = _normalize_rel_path(config.adl_file)
     normalized_exts = _normalize_extensions(config.code_extensions)
@@ -448,123 +1028,53 @@ def mine_repository(
     logger.info("Scanning for commits that changed: %s", normalized_adl_path)
     logger.info("Context window (days): %s", config.context_days)
 
-    training_data: List[TrainingSample] = []
     adl_commit_count = 0
     tracked_adl_path = normalized_adl_path
 
-    for target_commit in walker:
-        if not target_commit.parents:
-            commit_id = str(target_commit.id)
-            logger.info("Skipping root commit %s (no parent).", commit_id)
-            continue
-
-        parent_commit = target_commit.parents[0]
-        commit_id = str(target_commit.id)
-        parent_id = str(parent_commit.id)
-        is_merge = len(target_commit.parents) > 1
-        logger.info("Processing Target Commit (After): %s", commit_id)
-        logger.info("           Parent Commit (Before): %s", parent_id)
-
-        parent_tree = parent_commit.tree
-        current_tree = target_commit.tree
-
-        adl_result, code_diffs_x1 = _collect_commit_diffs(
-            repo,
-            parent_tree,
-            current_tree,
-            tracked_adl_path,
-            normalized_exts,
-        )
-
-        if adl_result.get("previous_path"):
-            tracked_adl_path = _normalize_rel_path(adl_result["previous_path"] or tracked_adl_path)
-
-        if not adl_result.get("touched"):
-            continue
-
-        adl_hunks = adl_result.get("hunks", [])
-        if not adl_hunks:
-            logger.info(
-                "  -> SKIP: ADL diff empty or non-textual (status=%s)",
-                adl_result.get("status", "unknown"),
-            )
-            continue
-
-        if not code_diffs_x1:
-            logger.info(
-                "  -> SKIP: Commit %s touched ADL but has no matching code diffs.",
-                commit_id,
+    if config.workers > 1:
+        # closing() shuts the pool down as soon as max_samples is reached.
+        with contextlib.closing(
+            _mine_in_parallel(repo, commits, tracked_adl_path, normalized_exts, config)
+        ) as samples:
+            for data_pair in samples:
+                adl_commit_count += 1
+                yield data_pair
+                if adl_commit_count == config.max_samples:
+                    break
+    else:
+        delta_lookup = make_delta_lookup(repo)
+        patch_cache = _PatchCache()
+        for target_commit in commits:
+            if not target_commit.parents:
+                logger.info("Skipping root commit %s (no parent).", target_commit.id)
+                continue
+
+            data_pair, previous_path = _process_commit(
+                repo,
+                target_commit,
+                tracked_adl_path,
+                normalized_exts,
+                config,
+                delta_lookup,
+                patch_cache,
             )
-            continue
-
-        adl_commit_count += 1
-
-        code_paths = [diff_entry["path"] for diff_entry in code_diffs_x1]
-        unique_code_paths = list(dict.fromkeys(code_paths))
-        analysis_until = _signature_datetime(parent_commit.committer)
-        analysis_since = analysis_until - timedelta(days=config.context_days)
-        per_file_stats, aggregate_stats = collect_context_stats(
-            repo=repo,
-            parent_commit=parent_commit,
-            files=unique_code_paths,
-            since_dt=analysis_since,
-            until_dt=analysis_until,
-        )
-        per_file_list = [
-            {
-                "path": path,
-                **stats,
-            }
-            for path, stats in per_file_stats.items()
-        ]
-        context_signals = {
-            "analysis_parent_hash": parent_id,
-            "analysis_timespan_days": config.context_days,
-            "files_analyzed": unique_code_paths,
-            "aggregate_stats": aggregate_stats,
-            "per_file_stats": per_file_list,
-        }
-
-        intent_x2 = (target_commit.message or "").strip()
-
-        author = target_commit.author
-        committer = target_commit.committer
-
-        data_pair: TrainingSample = {
-            "commit_hash": commit_id,
-            "parent_hash": parent_id,
-            "authored_at": _format_timestamp(author),
-            "committed_at": _format_timestamp(committer),
-            "author_name": author.name or "",
-            "author_email": author.email or "",
-            "committer_name": committer.name or author.name or "",
-            "committer_email": committer.email or author.email or "",
-            "is_merge": is_merge,
-            "intent_message": intent_x2,
-            "adl_diff": {
-                "path": adl_result.get("current_path") or tracked_adl_path,
-                "previous_path": adl_result.get("previous_path"),
-                "status": adl_result.get("status", "modified"),
-                "hunks": adl_result.get("hunks", []),
-                "stats": adl_result.get("stats", {"additions": 0, "deletions": 0}),
-            },
-            "code_diffs": code_diffs_x1,
-            "context_signals": context_signals,
-        }
-        training_data.append(data_pair)
-        logger.info(
-            "  -> SUCCESS: Found %s code diffs and 1 ADL diff.",
-            len(code_diffs_x1),
-        )
+            if previous_path:
+                tracked_adl_path = _normalize_rel_path(previous_path)
+            if data_pair is None:
+                continue
+
+            adl_commit_count += 1
+            yield data_pair
+            if adl_commit_count == config.max_samples:
+                break
 
     if not adl_commit_count:
         logger.warning("No commits found that modified '%s'.", normalized_adl_path)
 
     logger.info(
         "Mining complete. Extracted %s training pairs.",
-        len(training_data),
+        adl_commit_count,
     )
-    return training_data
 
 
 @app.command(name="mine")
@@ -615,6 +1125,59 @@ def mine(
         show_default=True,
         min=1,
     ),
+    workers: int = typer.Option(
+        DEFAULT_WORKERS,
+        "--workers",
+        "-j",
+        help=(
+            "Worker processes for per-commit diff and context mining "
+            "(1 keeps everything in-process, 0 uses every CPU)."
+        ),
+        show_default=True,
+        min=0,
+    ),
+    include_hunk_context: bool = typer.Option(
+        True,
+        "--hunk-context/--no-hunk-context",
+        help=(
+            "Keep unchanged context lines in each hunk's `context` list; "
+            "--no-hunk-context emits empty lists to cut memory on large diffs."
+        ),
+        show_default=True,
+    ),
+    detect_renames: bool = typer.Option(
+        True,
+        "--renames/--no-renames",
+        help=(
+            "Pair renamed code files in commit diffs; --no-renames reports them as "
+            "delete + add and skips similarity search. ADL renames are followed either way."
+        ),
+        show_default=True,
+    ),
+    since: Optional[datetime] = typer.Option(
+        None,
+        "--since",
+        formats=["%Y-%m-%d", "%Y-%m-%dT%H:%M:%S"],
+        help="Stop walking history at commits committed before this UTC date.",
+        show_default=False,
+    ),
+    max_samples: Optional[int] = typer.Option(
+        None,
+        "--max-samples",
+        help="Stop once this many training pairs have been mined.",
+        show_default=False,
+        min=1,
+    ),
+    sort_order: str = typer.Option(
+        DEFAULT_SORT_ORDER,
+        "--sort-order",
+        callback=_validate_sort_order,
+        help=(
+            "libgit2 walker sorting: none or topological. History is walked "
+            "along first parents, so both modes visit commits in the same order."
+        ),
+        show_default=True,
+    ),
 ) -> None:
     """Mine ADL-related commits and persist the resulting dataset."""
     validated_context_days = _validate_context_days(context_days)
@@ -626,23 +1189,47 @@ def mine(
         adl_file=adl_file,
         code_extensions=selected_code_exts,
         context_days=validated_context_days,
+        include_hunk_context=include_hunk_context,
+        workers=workers or os.cpu_count() or 1,
+        detect_renames=detect_renames,
+        since=since,
+        max_samples=max_samples,
+        sort_order=sort_order,
     )
     training_pairs = mine_repository(config=config)
+    # Peek at the first sample so an empty run never creates the output file.
+    first_pair = next(training_pairs, None)
 
-    if not training_pairs:
+    if first_pair is None:
         logger.warning("No training pairs were found; dataset not written.")
         raise typer.Exit(code=1)
 
-    destination, written = _write_training_dataset(output_path, training_pairs)
+    destination, written = _write_training_dataset(
+        output_path, itertools.chain((first_pair,), training_pairs)
+    )
     target_display = "stdout" if destination is None else str(destination)
     logger.info(
         "Saved %s training pairs to %s",
         written,
         target_display,
     )
-    _log_sample(training_pairs)
+    _log_sample(first_pair)
 
 
-def main() -> None:
-    """Entry point for tooling that expects a callable main."""
-    app()
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Entry point for tooling that expects a callable main.
+
+    Args:
+        argv: Arguments excluding the program name; defaults to ``sys.argv[1:]``.
+
+    Returns:
+        The process exit code, so callers can run the CLI in-process.
+    """
+    args = None if argv is None else _expand_code_exts_args(["arch-diff-miner", *argv])[1:]
+    try:
+        app(args=args, prog_name="arch-diff-miner")
+    except SystemExit as exc:
+        if exc.code is None or isinstance(exc.code, int):
+            return exc.code or 0
+        return 1
+    return 0
@@ -1,10 +1,23 @@
 """Context mining utilities for per-file Git statistics."""
 from __future__ import annotations
 
+import functools
 import logging
-from collections import OrderedDict, defaultdict
+import math
+import os
+import subprocess
+from collections import Counter, OrderedDict
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Iterable, List, MutableMapping, Sequence, Tuple
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 import pygit2
 
@@ -13,8 +26,13 @@ logger = logging.getLogger(__name__)
 PerFileStat = Dict[str, object]
 AggregateStats = Dict[str, object]
 PerFileStats = Dict[str, PerFileStat]
+# (parent tree OID bytes, tree OID bytes) -> (new_path, old_path) per delta.
+DeltaLookup = Callable[[bytes, bytes], Tuple[Tuple[Optional[str], Optional[str]], ...]]
 
 SECONDS_PER_DAY = 86_400
+DELTA_CACHE_SIZE = 4096
+# Opt-in: read the context window from one batched `git log` instead of libgit2 diffs.
+FAST_DIFFTREE_ENV = "ARCHDIFF_FAST_DIFFTREE"
 
 
 def _normalize_path(path: str) -> str:
@@ -28,6 +46,13 @@ def _normalize_path(path: str) -> str:
     return normalized.strip()
 
 
+@functools.lru_cache(maxsize=65_536)
+def _norm_lower(path: str) -> str:
+    """Return the normalized, lower-cased lookup key for a repository path."""
+
+    return _normalize_path(path).lower()
+
+
 def _ensure_utc(dt: datetime) -> datetime:
     """Return a timezone-aware UTC datetime."""
 
@@ -53,18 +78,200 @@ def _days_between(later: datetime, earlier: datetime | None) -> float:
     return seconds / SECONDS_PER_DAY
 
 
-def _touch_matches(delta: pygit2.DiffDelta, targets: Dict[str, str]) -> Iterable[str]:
-    """Yield canonical targets touched by the provided delta."""
+def _fast_difftree_enabled() -> bool:
+    """Return True when the batched `git log` fast path is requested via env."""
 
-    seen: set[str] = set()
-    for candidate in (delta.new_file.path, delta.old_file.path):
-        cleaned = _normalize_path(candidate or "")
-        if not cleaned:
+    return os.environ.get(FAST_DIFFTREE_ENV, "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _group_name_status(tokens: Sequence[str]) -> List[Tuple[str, ...]]:
+    """Group `-z --name-status` tokens into (new, old) path tuples per delta."""
+
+    groups: List[Tuple[str, ...]] = []
+    i = 0
+    while i < len(tokens):
+        status = tokens[i].lstrip("\n")
+        if not status:
+            i += 1
             continue
-        canonical = targets.get(cleaned.lower())
-        if canonical and canonical not in seen:
-            seen.add(canonical)
-            yield canonical
+        # Renames and copies (e.g. R100) carry both the old and the new path.
+        width = 2 if status[0] in "RC" else 1
+        paths = tokens[i + 1 : i + 1 + width]
+        groups.append(tuple(reversed(paths)))
+        i += 1 + width
+    return groups
+
+
+def _parse_log_record(raw: bytes) -> Tuple[datetime, str, List[Tuple[str, ...]]]:
+    """Parse one `git log` record emitted with ``_LOG_FORMAT`` and ``-z``."""
+
+    tokens = raw.decode("utf-8", errors="replace").split("\0")
+    email, name, timestamp = tokens[1], tokens[2], tokens[3]
+    commit_dt = datetime.fromtimestamp(int(timestamp), timezone.utc)
+    identity = (email or name or "").strip().lower() or "unknown"
+    return commit_dt, identity, _group_name_status(tokens[4:])
+
+
+# \x01 separates commits; NUL separates hash, author email/name, and commit time.
+_LOG_FORMAT = "%x01%H%x00%ae%x00%an%x00%ct"
+
+
+def _git_log_touches(
+    repo: pygit2.Repository,
+    parent_commit: pygit2.Commit,
+    since_utc: datetime,
+    until_utc: datetime,
+    targets: Dict[str, int],
+) -> Optional[List[Tuple[datetime, str, List[int]]]]:
+    """Collect target touches for the whole window from one `git log` call.
+
+    Args:
+        repo: Open pygit2 repository.
+        parent_commit: Newest commit of the first-parent chain to inspect.
+        since_utc: Inclusive lower bound for committer timestamps.
+        until_utc: Inclusive upper bound for committer timestamps.
+        targets: Lower-cased path -> target index lookup.
+
+    Returns:
+        ``(commit_dt, identity, touched_paths)`` per matching delta, newest
+        first, or None when git failed so callers can fall back to libgit2.
+    """
+
+    cmd = [
+        "git",
+        "--git-dir",
+        repo.path,
+        "log",
+        "-z",
+        # User config must not change the byte stream: signature checks and
+        # colour codes would otherwise be mixed into the parsed records.
+        "--no-show-signature",
+        "--no-color",
+        "--first-parent",
+        "-m",
+        "--no-renames",
+        "--name-status",
+        f"--format={_LOG_FORMAT}",
+        f"--max-age={math.ceil(since_utc.timestamp())}",
+        f"--min-age={math.floor(until_utc.timestamp())}",
+        str(parent_commit.id),
+    ]
+    touches: List[Tuple[datetime, str, List[int]]] = []
+
+    def _consume(raw: bytes) -> None:
+        if not raw:
+            return
+        commit_dt, identity, groups = _parse_log_record(raw)
+        for paths in groups:
+            touched = list(_touch_matches(paths, targets))
+            if touched:
+                touches.append((commit_dt, identity, touched))
+
+    try:
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL) as proc:
+            assert proc.stdout is not None
+            pending = b""
+            # Stream-parse so memory stays bounded by matching touches.
+            for chunk in iter(lambda: proc.stdout.read(1 << 16), b""):
+                *complete, pending = (pending + chunk).split(b"\x01")
+                for raw in complete:
+                    _consume(raw)
+            _consume(pending)
+    except OSError as error:
+        logger.warning("git log failed in %s; using libgit2: %s", repo.path, error)
+        return None
+    if proc.returncode != 0:
+        logger.warning(
+            "git log exited with %s in %s; using libgit2.", proc.returncode, repo.path
+        )
+        return None
+    return touches
+
+
+def make_delta_lookup(repo: pygit2.Repository, maxsize: int = DELTA_CACHE_SIZE) -> DeltaLookup:
+    """Return an LRU-cached tree-pair -> delta paths lookup bound to ``repo``.
+
+    Trees are immutable, so results keyed by raw OID bytes stay valid for the
+    whole run; sharing one lookup across ``collect_context_stats`` calls lets
+    overlapping context windows reuse each other's tree diffs.
+
+    Args:
+        repo: Open pygit2 repository used to compute cache misses.
+        maxsize: Maximum number of tree pairs to keep.
+
+    Returns:
+        Callable mapping (parent tree OID bytes, tree OID bytes) to a tuple of
+        (new_path, old_path) pairs, one per delta.
+    """
+
+    @functools.lru_cache(maxsize=maxsize)
+    def _deltas_for(
+        parent_tree_oid: bytes, tree_oid: bytes
+    ) -> Tuple[Tuple[Optional[str], Optional[str]], ...]:
+        diff = repo.diff(
+            repo[pygit2.Oid(raw=parent_tree_oid)], repo[pygit2.Oid(raw=tree_oid)]
+        )
+        # Rename detection is skipped: a rename already surfaces as a delete of
+        # the old path plus an add of the new one, and targets are fixed paths.
+        # Only paths are needed here, so never ask libgit2 to build patches.
+        return tuple((delta.new_file.path, delta.old_file.path) for delta in diff.deltas)
+
+    return _deltas_for
+
+
+def _libgit2_touches(
+    repo: pygit2.Repository,
+    parent_commit: pygit2.Commit,
+    since_utc: datetime,
+    until_utc: datetime,
+    targets: Dict[str, int],
+    delta_lookup: DeltaLookup,
+) -> Iterator[Tuple[datetime, str, List[int]]]:
+    """Yield target touches by walking first-parent history with libgit2."""
+
+    empty_tree_oid = repo.TreeBuilder().write().raw
+
+    walker = repo.walk(parent_commit.id, pygit2.GIT_SORT_TIME)
+    walker.simplify_first_parent()
+
+    for commit in walker:
+        commit_dt = _commit_datetime(commit)
+        if commit_dt > until_utc:
+            continue
+        if commit_dt < since_utc:
+            break
+        parent_tree_oid = commit.parents[0].tree_id.raw if commit.parents else empty_tree_oid
+        try:
+            delta_paths = delta_lookup(parent_tree_oid, commit.tree_id.raw)
+        except pygit2.GitError as error:  # pragma: no cover - defensive
+            # Context stats should not prevent dataset creation; warn and continue.
+            repo_path = getattr(repo, "path", "<repo>")
+            logger.warning("Context diff failed in %s: %s", repo_path, error)
+            continue
+
+        for paths in delta_paths:
+            touched = list(_touch_matches(paths, targets))
+            if not touched:
+                continue
+
+            author = commit.author
+            identity = (author.email or author.name or "").strip().lower() or "unknown"
+            yield commit_dt, identity, touched
+
+
+def _touch_matches(paths: Iterable[Optional[str]], targets: Dict[str, int]) -> Iterable[int]:
+    """Yield indices of the targets touched by the provided delta paths."""
+
+    seen: set[int] = set()
+    for candidate in paths:
+        # Paths repeat heavily across commits; memoize the string munging.
+        key = _norm_lower(candidate or "")
+        if not key:
+            continue
+        index = targets.get(key)
+        if index is not None and index not in seen:
+            seen.add(index)
+            yield index
 
 
 def collect_context_stats(
@@ -73,6 +280,7 @@ def collect_context_stats(
     files: Sequence[str],
     since_dt: datetime,
     until_dt: datetime,
+    delta_lookup: Optional[DeltaLookup] = None,
 ) -> Tuple[PerFileStats, AggregateStats]:
     """Compute churn, authors, and recency metrics per file.
 
@@ -82,6 +290,8 @@ def collect_context_stats(
         files: Iterable of repository-relative file paths to track.
         since_dt: Inclusive lower bound for commit timestamps.
         until_dt: Inclusive upper bound for commit timestamps.
+        delta_lookup: Optional shared cache from ``make_delta_lookup``; a
+            per-call cache is used when omitted.
 
     Returns:
         Tuple of per-file stats (OrderedDict keyed by normalized path) and
@@ -89,7 +299,7 @@ def collect_context_stats(
     """
 
     canonical: List[str] = []
-    lookup: Dict[str, str] = {}
+    lookup: Dict[str, int] = {}
     for path in files:
         cleaned = _normalize_path(path)
         if not cleaned:
@@ -97,7 +307,7 @@ def collect_context_stats(
         lower = cleaned.lower()
         if lower in lookup:
             continue
-        lookup[lower] = cleaned
+        lookup[lower] = len(canonical)
         canonical.append(cleaned)
 
     if not canonical:
@@ -108,69 +318,47 @@ def collect_context_stats(
     if since_utc > until_utc:
         raise ValueError("since_dt must be less than or equal to until_dt")
 
-    churn_counts: MutableMapping[str, int] = OrderedDict((path, 0) for path in canonical)
-    author_sets: Dict[str, set[str]] = {path: set() for path in canonical}
-    author_freq: Dict[str, MutableMapping[str, int]] = {
-        path: defaultdict(int) for path in canonical
-    }
-    last_touched: Dict[str, datetime | None] = {path: None for path in canonical}
-
-    empty_tree = repo[repo.TreeBuilder().write()]
-
-    walker = repo.walk(parent_commit.id, pygit2.GIT_SORT_TIME)
-    walker.simplify_first_parent()
-
-    for commit in walker:
-        commit_dt = _commit_datetime(commit)
-        if commit_dt > until_utc:
-            continue
-        if commit_dt < since_utc:
-            break
-        parent_tree = commit.parents[0].tree if commit.parents else empty_tree
-        try:
-            diff = repo.diff(parent_tree, commit.tree)
-        except pygit2.GitError as error:  # pragma: no cover - defensive
-            # Context stats should not prevent dataset creation; warn and continue.
-            repo_path = getattr(repo, "path", "<repo>")
-            logger.warning("Context diff failed in %s: %s", repo_path, error)
-            continue
-
-        try:
-            diff.find_similar()
-        except AttributeError:  # pragma: no cover - older pygit2
-            pass
-
-        for patch in diff:
-            touched = list(_touch_matches(patch.delta, lookup))
-            if not touched:
-                continue
-
-            author = commit.author
-            identity = (author.email or author.name or "").strip().lower() or "unknown"
+    # Parallel per-target arrays indexed like ``canonical``. Each Counter holds
+    # touches per author, so churn is its total and unique authors its length.
+    author_freq: List[Counter[str]] = [Counter() for _ in canonical]
+    last_touched: List[datetime | None] = [None] * len(canonical)
+
+    touches: Optional[Iterable[Tuple[datetime, str, List[int]]]] = None
+    if _fast_difftree_enabled():
+        touches = _git_log_touches(repo, parent_commit, since_utc, until_utc, lookup)
+    if touches is None:
+        touches = _libgit2_touches(
+            repo,
+            parent_commit,
+            since_utc,
+            until_utc,
+            lookup,
+            delta_lookup or make_delta_lookup(repo),
+        )
 
-            for path in touched:
-                churn_counts[path] += 1
-                author_sets[path].add(identity)
-                author_freq[path][identity] += 1
-                previous = last_touched[path]
-                if previous is None or commit_dt > previous:
-                    last_touched[path] = commit_dt
+    for commit_dt, identity, touched in touches:
+        for index in touched:
+            author_freq[index][identity] += 1
+            previous = last_touched[index]
+            if previous is None or commit_dt > previous:
+                last_touched[index] = commit_dt
 
     per_file: PerFileStats = OrderedDict()
     all_authors: set[str] = set()
     freshest: List[float] = []
-
-    for path in canonical:
-        churn = churn_counts[path]
-        unique = len(author_sets[path])
-        last_days = _days_between(until_utc, last_touched[path])
+    total_commits = 0
+
+    for index, path in enumerate(canonical):
+        authors = author_freq[index]
+        churn = sum(authors.values())
+        unique = len(authors)
+        last_days = _days_between(until_utc, last_touched[index])
+        total_commits += churn
         if churn:
             freshest.append(last_days)
-            all_authors.update(author_sets[path])
+            all_authors.update(authors)
 
-        sorted_authors = sorted(
-            author_freq[path].items(), key=lambda item: (-item[1], item[0])
-        )
+        sorted_authors = sorted(authors.items(), key=lambda item: (-item[1], item[0]))
         top_authors = [email for email, _ in sorted_authors[:3]]
 
         per_file[path] = {
@@ -181,7 +369,7 @@ def collect_context_stats(
         }
 
     aggregate: AggregateStats = {
-        "total_commits": sum(churn_counts.values()),
+        "total_commits": total_commits,
         "total_unique_authors": len(all_authors),
         "most_recent_change_days_ago": min(freshest) if freshest else 0.0,
     }
@@ -189,4 +377,4 @@ def collect_context_stats(
     return per_file, aggregate
 
 
-__all__ = ["collect_context_stats"]
+__all__ = ["collect_context_stats", "make_delta_lookup"]
@@ -1,26 +1,58 @@
 """Helpers for streaming SPEC-compliant JSONL records."""
 from __future__ import annotations
 
+import functools
 import json
 import logging
+import queue
 import sys
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional
 
+try:  # Optional fast encoder; see the `fast` extra in pyproject.toml.
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is absent
+    orjson = None  # type: ignore[assignment]
 
 logger = logging.getLogger(__name__)
 DATASET_VERSION = "adl-diff-miner-schema-v2.0"
+# Output buffer size. The C BufferedWriter batches records and issues one
+# write syscall per MiB, so no Python-level bytearray batching is needed.
+WRITE_BUFFER_SIZE = 1 << 20
+# Samples buffered between the mining thread and the writer thread.
+WRITE_QUEUE_SIZE = 64
+_END_OF_SAMPLES = object()
 
 
 JsonlRecord = Dict[str, Any]
 
 
+@functools.lru_cache(maxsize=1)
+def _utc_iso_seconds(epoch_seconds: int) -> str:
+    """Format epoch seconds as a UTC ISO-8601 timestamp; cached per second."""
+    return datetime.fromtimestamp(epoch_seconds, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
 def _now_utc_iso() -> str:
-    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    # Second resolution (as in the spec example) lets records written within
+    # the same second share one formatted string.
+    return _utc_iso_seconds(int(time.time()))
+
+
+class ContextSignals(Dict[str, Any]):
+    """A ``context_signals`` block whose producer already emits SPEC types.
+
+    ``_build_record`` writes instances as-is instead of re-coercing every
+    field; plain dicts from other producers are still normalized.
+    """
 
 
 def _normalize_context_signals(raw: Dict[str, Any]) -> Dict[str, Any]:
+    if isinstance(raw, ContextSignals):
+        return raw
     files = raw.get("files_analyzed") or []
     deduped_files = list(dict.fromkeys(files))
 
@@ -33,19 +65,16 @@ def _normalize_context_signals(raw: Dict[str, Any]) -> Dict[str, Any]:
         ),
     }
 
-    per_file_entries: List[Dict[str, Any]] = []
-    for entry in raw.get("per_file_stats") or []:
-        per_file_entries.append(
-            {
-                "path": entry.get("path"),
-                "churn_count": int(entry.get("churn_count", 0)),
-                "unique_authors": int(entry.get("unique_authors", 0)),
-                "last_modified_days_ago": float(
-                    entry.get("last_modified_days_ago", 0.0)
-                ),
-                "top_authors": entry.get("top_authors", []),
-            }
-        )
+    per_file_entries: List[Dict[str, Any]] = [
+        {
+            "path": entry.get("path"),
+            "churn_count": int(entry.get("churn_count", 0)),
+            "unique_authors": int(entry.get("unique_authors", 0)),
+            "last_modified_days_ago": float(entry.get("last_modified_days_ago", 0.0)),
+            "top_authors": entry.get("top_authors", []),
+        }
+        for entry in raw.get("per_file_stats") or []
+    ]
 
     return {
         "analysis_parent_hash": raw.get("analysis_parent_hash"),
@@ -57,54 +86,54 @@ def _normalize_context_signals(raw: Dict[str, Any]) -> Dict[str, Any]:
 
 
 def _build_record(sample: Dict[str, Any]) -> Optional[JsonlRecord]:
-    adl_diff = sample.get("adl_diff") or {}
-    code_diffs = sample.get("code_diffs") or []
+    # Bind the lookup once; this function reads ~15 sample keys per record.
+    get = sample.get
+    adl_diff = get("adl_diff") or {}
+    code_diffs = get("code_diffs") or []
 
     if not adl_diff.get("hunks"):
-        logger.info("Skipping sample %s: empty ADL diff.", sample.get("commit_hash"))
+        logger.info("Skipping sample %s: empty ADL diff.", get("commit_hash"))
         return None
     if not code_diffs:
         logger.info(
-            "Skipping sample %s: no qualifying code diffs.", sample.get("commit_hash")
+            "Skipping sample %s: no qualifying code diffs.", get("commit_hash")
         )
         return None
 
-    filtered_code: List[Dict[str, Any]] = []
-    for entry in code_diffs:
-        if not entry.get("hunks"):
-            continue
-        filtered_code.append(
-            {
-                "path": entry.get("path"),
-                "status": entry.get("status", "modified"),
-                "extension": entry.get("extension", ""),
-                "language": entry.get("language"),
-                "hunks": entry.get("hunks", []),
-                "stats": entry.get("stats", {"additions": 0, "deletions": 0}),
-            }
-        )
+    filtered_code: List[Dict[str, Any]] = [
+        {
+            "path": entry.get("path"),
+            "status": entry.get("status", "modified"),
+            "extension": entry.get("extension", ""),
+            "language": entry.get("language"),
+            "hunks": entry["hunks"],
+            "stats": entry.get("stats", {"additions": 0, "deletions": 0}),
+        }
+        for entry in code_diffs
+        if entry.get("hunks")
+    ]
 
     if not filtered_code:
         logger.info(
             "Skipping sample %s: code hunks empty after filtering.",
-            sample.get("commit_hash"),
+            get("commit_hash"),
         )
         return None
 
     commit_block: Dict[str, Any] = {
-        "hash": sample.get("commit_hash"),
-        "parent_hash": sample.get("parent_hash"),
-        "authored_at": sample.get("authored_at"),
-        "committed_at": sample.get("committed_at"),
+        "hash": get("commit_hash"),
+        "parent_hash": get("parent_hash"),
+        "authored_at": get("authored_at"),
+        "committed_at": get("committed_at"),
         "author": {
-            "name": sample.get("author_name", ""),
-            "email": sample.get("author_email", ""),
+            "name": get("author_name", ""),
+            "email": get("author_email", ""),
         },
-        "is_merge": sample.get("is_merge", False),
+        "is_merge": get("is_merge", False),
     }
 
-    committer_name = sample.get("committer_name")
-    committer_email = sample.get("committer_email")
+    committer_name = get("committer_name")
+    committer_email = get("committer_email")
     if committer_name or committer_email:
         commit_block["committer"] = {
             "name": committer_name,
@@ -123,7 +152,7 @@ def _build_record(sample: Dict[str, Any]) -> Optional[JsonlRecord]:
     record: JsonlRecord = {
         "commit": commit_block,
         "intent": {
-            "message": sample.get("intent_message", ""),
+            "message": get("intent_message", ""),
             "source": {"type": "commit_message"},
         },
         "adl_diff": adl_block,
@@ -134,38 +163,106 @@ def _build_record(sample: Dict[str, Any]) -> Optional[JsonlRecord]:
         },
     }
 
-    context_signals = sample.get("context_signals")
+    context_signals = get("context_signals")
     if context_signals:
         record["context_signals"] = _normalize_context_signals(context_signals)
 
     return record
 
 
+def _dump_record(record: JsonlRecord) -> bytes:
+    """Serialize one record as a UTF-8 JSON line, preferring orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+    # Compact separators match orjson's layout and trim output size.
+    line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+    return (line + "\n").encode("utf-8")
+
+
+def _drain_samples(pending: "queue.Queue[Any]", stream: Optional[BinaryIO]) -> int:
+    """Build and write records from the queue until the sentinel arrives."""
+    text_stdout = None
+    if stream is None:
+        # Write bytes straight to stdout's buffer; fall back to text for
+        # replaced streams (e.g. StringIO) that do not expose one.
+        sys.stdout.flush()
+        stream = getattr(sys.stdout, "buffer", None)
+        if stream is None:
+            text_stdout = sys.stdout
+
+    written = 0
+    while True:
+        sample = pending.get()
+        if sample is _END_OF_SAMPLES:
+            if stream is not None:
+                stream.flush()
+            return written
+        record = _build_record(sample)
+        if record is None:
+            continue
+        line = _dump_record(record)
+        if text_stdout is not None:
+            text_stdout.write(line.decode("utf-8"))
+        else:
+            stream.write(line)
+        written += 1
+
+
+def _enqueue(pending: "queue.Queue[Any]", item: Any, writer: Future[int]) -> None:
+    """Block until ``item`` is queued, surfacing writer failures instead of hanging.
+
+    The writer is checked before every put, not only when the queue is full,
+    so mining stops at the first failed write instead of filling the queue.
+    """
+    while True:
+        if writer.done():
+            writer.result()
+            raise RuntimeError("JSONL writer stopped before draining samples.")
+        try:
+            pending.put(item, timeout=0.1)
+            return
+        except queue.Full:
+            continue
+
+
 def write_jsonl_dataset(
     samples: Iterable[Dict[str, Any]],
     destination: Optional[Path],
 ) -> int:
-    """Stream JSONL records; return count of emitted samples."""
+    """Stream JSONL records; return count of emitted samples.
+
+    Samples are pulled from ``samples`` on the calling thread while a single
+    writer thread builds, serializes, and writes records, so CPU-bound mining
+    overlaps with output IO.
+
+    Args:
+        samples: Training samples, typically the ``mine_repository`` generator.
+        destination: Output file path, or None to stream to stdout.
+
+    Returns:
+        Number of records written.
+    """
     stream = None
     close_stream = False
 
     if destination is not None:
         destination.parent.mkdir(parents=True, exist_ok=True)
-        stream = destination.open("w", encoding="utf-8"); close_stream = True
-
-    written = 0
-    for sample in samples:
-        record = _build_record(sample)
-        if record is None:
-            continue
-        line = json.dumps(record, ensure_ascii=False)
-        if stream is None:
-            sys.stdout.write(line + "\n")
-        else:
-            stream.write(line + "\n")
-        written += 1
+        stream = destination.open("wb", buffering=WRITE_BUFFER_SIZE)
+        close_stream = True
 
-    if close_stream and stream is not None:
-        stream.close()
+    pending: "queue.Queue[Any]" = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+    try:
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="jsonl-writer") as executor:
+            writer = executor.submit(_drain_samples, pending, stream)
+            try:
+                for sample in samples:
+                    _enqueue(pending, sample, writer)
+            finally:
+                if not writer.done():
+                    _enqueue(pending, _END_OF_SAMPLES, writer)
+            written = writer.result()
+    finally:
+        if close_stream and stream is not None:
+            stream.close()
 
     return written
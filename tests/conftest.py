@@ -2,105 +2,158 @@
 from __future__ import annotations
 
 import json
-import subprocess
+import shutil
+from dataclasses import replace
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict
 
 import pytest
 
+from tests.fixtures import (
+    Issue18Repo,
+    RepoBuilder,
+    SeededContextRepo,
+    seed_context_repo,
+    seed_issue18_repo,
+)
 
-def _run(cmd: list[str], cwd: Path) -> str:
-    result = subprocess.run(
-        cmd,
-        cwd=str(cwd),
-        check=True,
-        text=True,
-        capture_output=True,
-    )
-    return result.stdout.strip()
-
-
-def _write(repo: Path, rel_path: str, content: str) -> None:
-    target = repo / rel_path
-    target.parent.mkdir(parents=True, exist_ok=True)
-    target.write_text(content, encoding="utf-8")
 
+_SIGNATURE = ("Test User", "test@example.com")
 
-@pytest.fixture()
-def sample_repo(tmp_path: Path) -> Dict[str, object]:
-    """Create a tiny git repo with commits covering traversal edge cases."""
-
-    repo = tmp_path / "repo"
-    repo.mkdir(parents=True)
 
-    def git(*args: str) -> str:
-        return _run(["git", *args], cwd=repo)
+@pytest.fixture(scope="module")
+def sample_repo(tmp_path_factory: pytest.TempPathFactory) -> Dict[str, object]:
+    """Create a tiny git repo with commits covering traversal edge cases.
 
-    git("init", "-q")
-    git("config", "user.name", "Test User")
-    git("config", "user.email", "test@example.com")
+    Seeded through RepoBuilder like the other fixture repos. Shared across a
+    module: consumers only mine it and must not mutate it.
+    """
 
-    commits: Dict[str, str] = {}
+    path = tmp_path_factory.mktemp("sample_repo") / "repo"
+    builder = RepoBuilder(path)
+    now = datetime.now(timezone.utc)
+    main = "refs/heads/main"
+    shas: Dict[str, str] = {}
 
     # Root commit (should be skipped).
-    _write(repo, "adl.yaml", "title: ADR 1\nstatus: draft\n")
-    _write(repo, "src/app.py", "print('root')\n")
-    git("add", "-A")
-    git("commit", "-q", "-m", "root")
-    commits["root"] = git("rev-parse", "HEAD")
+    shas["root"] = builder.commit(
+        main,
+        _SIGNATURE,
+        now,
+        "root",
+        {"adl.yaml": "title: ADR 1\nstatus: draft\n", "src/app.py": "print('root')\n"},
+    )
 
     # ADL + code change.
-    _write(repo, "adl.yaml", "title: ADR 1\nstatus: proposed\nnotes: logging\n")
-    _write(repo, "src/app.py", "print('adl+code v1')\n")
-    git("add", "-A")
-    git("commit", "-q", "-m", "adl+code update")
-    commits["adl_code"] = git("rev-parse", "HEAD")
+    shas["adl_code"] = builder.commit(
+        main,
+        _SIGNATURE,
+        now,
+        "adl+code update",
+        {
+            "adl.yaml": "title: ADR 1\nstatus: proposed\nnotes: logging\n",
+            "src/app.py": "print('adl+code v1')\n",
+        },
+        parent=shas["root"],
+    )
 
     # Feature branch with ADL + code change.
-    git("checkout", "-q", "-b", "feature")
-    _write(repo, "adl.yaml", "title: ADR 1\nstatus: proposed\nnotes: feature\n")
-    _write(repo, "src/feature.py", "print('feature branch')\n")
-    git("add", "-A")
-    git("commit", "-q", "-m", "feature adl+code")
-    commits["feature"] = git("rev-parse", "HEAD")
-
-    # Back to main, make a code-only tweak, then merge feature (introduces merge commit).
-    git("checkout", "-q", "main")
-    _write(repo, "src/app.py", "print('main pre-merge')\n")
-    git("add", "src/app.py")
-    git("commit", "-q", "-m", "main pre-merge change")
-    git("merge", "-q", "--no-ff", "feature", "-m", "Merge feature branch")
-    # Ensure the merge commit includes fresh ADL + code edits relative to the
-    # first parent so it becomes a valid sample.
-    merged_adl = (repo / "adl.yaml").read_text(encoding="utf-8")
-    _write(repo, "adl.yaml", merged_adl + "notes: merged\n")
-    _write(repo, "src/app.py", "print('merge commit payload')\n")
-    git("add", "-A")
-    git("commit", "-q", "--amend", "--no-edit")
-    commits["merge"] = git("rev-parse", "HEAD")
+    feature_adl = "title: ADR 1\nstatus: proposed\nnotes: feature\n"
+    shas["feature"] = builder.commit(
+        "refs/heads/feature",
+        _SIGNATURE,
+        now,
+        "feature adl+code",
+        {"adl.yaml": feature_adl, "src/feature.py": "print('feature branch')\n"},
+        parent=shas["adl_code"],
+    )
+
+    # Back on main, make a code-only tweak, then merge feature (introduces merge commit).
+    pre_merge = builder.commit(
+        main,
+        _SIGNATURE,
+        now,
+        "main pre-merge change",
+        {"src/app.py": "print('main pre-merge')\n"},
+        parent=shas["adl_code"],
+    )
+    # The merge takes the feature side plus fresh ADL + code edits relative to
+    # the first parent so it becomes a valid sample.
+    merged_adl = feature_adl + "notes: merged\n"
+    shas["merge"] = builder.commit(
+        main,
+        _SIGNATURE,
+        now,
+        "Merge feature branch",
+        {
+            "adl.yaml": merged_adl,
+            "src/feature.py": "print('feature branch')\n",
+            "src/app.py": "print('merge commit payload')\n",
+        },
+        parent=pre_merge,
+        merge=shas["feature"],
+    )
 
     # Rename ADL file and modify code to keep code diff present.
-    original_adl = (repo / "adl.yaml").read_text(encoding="utf-8")
-    git("mv", "adl.yaml", "decisions.yaml")
-    _write(repo, "decisions.yaml", original_adl + "notes: renamed\n")
-    _write(repo, "src/app.py", "print('post-rename code change')\n")
-    git("add", "-A")
-    git("commit", "-q", "-m", "rename adl file")
-    commits["rename"] = git("rev-parse", "HEAD")
+    shas["rename"] = builder.commit(
+        main,
+        _SIGNATURE,
+        now,
+        "rename adl file",
+        {
+            "decisions.yaml": merged_adl + "notes: renamed\n",
+            "src/app.py": "print('post-rename code change')\n",
+        },
+        parent=shas["merge"],
+        renames=[("adl.yaml", "decisions.yaml")],
+    )
 
     # ADL-only change (should be filtered out).
-    _write(repo, "decisions.yaml", "title: ADR 1 (renamed)\nstatus: accepted\n")
-    git("add", "decisions.yaml")
-    git("commit", "-q", "-m", "adl only change")
-    commits["adl_only"] = git("rev-parse", "HEAD")
+    shas["adl_only"] = builder.commit(
+        main,
+        _SIGNATURE,
+        now,
+        "adl only change",
+        {"decisions.yaml": "title: ADR 1 (renamed)\nstatus: accepted\n"},
+        parent=shas["rename"],
+    )
 
     return {
-        "path": repo,
+        "path": path,
         "adl_current": "decisions.yaml",
-        "commits": commits,
+        "commits": shas,
     }
 
 
+@pytest.fixture(scope="session")
+def context_template_repo(tmp_path_factory: pytest.TempPathFactory) -> SeededContextRepo:
+    """Seed the context repo once per session for read-only tests; never write to it."""
+    return seed_context_repo(tmp_path_factory.mktemp("seed_cache"))
+
+
+@pytest.fixture(scope="session")
+def issue18_template_repo(tmp_path_factory: pytest.TempPathFactory) -> Issue18Repo:
+    """Seed the issue18 repo once per session for read-only tests; never write to it."""
+    return seed_issue18_repo(tmp_path_factory.mktemp("seed_cache"))
+
+
+@pytest.fixture()
+def context_repo(context_template_repo: SeededContextRepo, tmp_path: Path) -> SeededContextRepo:
+    """Per-test copy of the seeded context repo (same SHAs and expectations)."""
+    path = tmp_path / context_template_repo.path.name
+    shutil.copytree(context_template_repo.path, path)
+    return replace(context_template_repo, path=path)
+
+
+@pytest.fixture()
+def issue18_repo(issue18_template_repo: Issue18Repo, tmp_path: Path) -> Issue18Repo:
+    """Per-test copy of the seeded merge/binary/rename repo."""
+    path = tmp_path / issue18_template_repo.path.name
+    shutil.copytree(issue18_template_repo.path, path)
+    return replace(issue18_template_repo, path=path)
+
+
 def parse_jsonl(stdout: str) -> list[dict[str, object]]:
     """Parse the CLI stdout into JSON objects."""
     lines = [line for line in stdout.splitlines() if line.strip()]
@@ -1,9 +1,11 @@
 """Reusable git fixtures for tests."""
 
+from .repo_builder import RepoBuilder  # noqa: F401
 from .seed_context_repo import seed_context_repo, SeededContextRepo, FileHistory  # noqa: F401
 from .seed_issue18_repo import seed_issue18_repo, Issue18Repo  # noqa: F401
 
 __all__ = [
+    "RepoBuilder",
     "seed_context_repo",
     "SeededContextRepo",
     "FileHistory",
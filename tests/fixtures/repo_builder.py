@@ -0,0 +1,90 @@
+"""Build seed repositories in-process with pygit2."""
+from __future__ import annotations
+
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Mapping, Optional, Tuple, Union
+
+import pygit2
+
+FileContent = Union[str, bytes]
+
+
+class RepoBuilder:
+    """Write commits straight into a fresh repository's object database.
+
+    This is the single seeding helper for test repositories. Blobs, trees, and
+    commits are created through libgit2, so seeding costs a handful of C calls
+    per commit instead of `git` process spawns. Each commit starts from its
+    first parent's tree and may rename entries before applying file contents.
+    """
+
+    def __init__(self, repo_path: Path, branch: str = "main") -> None:
+        repo_path.mkdir(parents=True, exist_ok=True)
+        self.path = repo_path
+        self._repo = pygit2.init_repository(str(repo_path), initial_head=branch)
+        self._snapshots: Dict[str, Dict[str, pygit2.Oid]] = {}
+
+    def _write_tree(self, entries: Mapping[str, pygit2.Oid]) -> pygit2.Oid:
+        nested: Dict[str, object] = {}
+        for path, blob_id in entries.items():
+            *dirs, leaf = path.split("/")
+            node = nested
+            for part in dirs:
+                node = node.setdefault(part, {})  # type: ignore[assignment]
+            node[leaf] = blob_id
+
+        def _build(node: Mapping[str, object]) -> pygit2.Oid:
+            builder = self._repo.TreeBuilder()
+            for name, child in sorted(node.items()):
+                if isinstance(child, dict):
+                    builder.insert(name, _build(child), pygit2.GIT_FILEMODE_TREE)
+                else:
+                    builder.insert(name, child, pygit2.GIT_FILEMODE_BLOB)
+            return builder.write()
+
+        return _build(nested)
+
+    def commit(
+        self,
+        ref: str,
+        author: Tuple[str, str],
+        when: datetime,
+        message: str,
+        files: Optional[Mapping[str, FileContent]] = None,
+        *,
+        parent: Optional[str] = None,
+        merge: Optional[str] = None,
+        renames: Iterable[Tuple[str, str]] = (),
+    ) -> str:
+        """Create a commit on ``ref`` and return its SHA.
+
+        Args:
+            ref: Branch ref to update, e.g. ``refs/heads/main``.
+            author: (name, email) used for both author and committer.
+            when: Commit timestamp; written as epoch seconds in UTC.
+            message: Commit message (a trailing newline is added).
+            files: Path -> new content for files added or modified.
+            parent: SHA of the first parent; omit for a root commit.
+            merge: SHA of a second parent to record a merge.
+            renames: (old, new) path pairs renamed before ``files`` apply.
+        """
+        entries = dict(self._snapshots[parent]) if parent is not None else {}
+        for old, new in renames:
+            entries[new] = entries.pop(old)
+        for path, content in (files or {}).items():
+            payload = content.encode("utf-8") if isinstance(content, str) else content
+            entries[path] = self._repo.create_blob(payload)
+
+        signature = pygit2.Signature(author[0], author[1], int(when.timestamp()), 0)
+        parents = [pygit2.Oid(hex=sha) for sha in (parent, merge) if sha is not None]
+        oid = self._repo.create_commit(
+            None, signature, signature, f"{message}\n", self._write_tree(entries), parents
+        )
+        self._repo.references.create(ref, oid, force=True)
+        sha = str(oid)
+        self._snapshots[sha] = entries
+        return sha
+
+
+__all__ = ["RepoBuilder"]
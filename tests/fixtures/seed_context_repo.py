@@ -1,12 +1,12 @@
 """Deterministic on-disk Git repo for context-stats integration tests."""
 from __future__ import annotations
 
-import os
-import subprocess
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict, Iterable, List, Tuple
+from typing import Dict, Optional
+
+from .repo_builder import RepoBuilder
 
 
 @dataclass(frozen=True)
@@ -30,36 +30,10 @@ class SeededContextRepo:
     files: Dict[str, FileHistory]
 
 
-def _run_git(repo_path: Path, args: List[str], env: Dict[str, str] | None = None) -> str:
-    base_env = os.environ.copy()
-    if env:
-        base_env.update(env)
-    result = subprocess.run(
-        ["git", *args],
-        cwd=str(repo_path),
-        check=True,
-        capture_output=True,
-        text=True,
-        env=base_env,
-    )
-    return result.stdout.strip()
-
-
-def _write(repo_path: Path, rel_path: str, content: str) -> None:
-    target = repo_path / rel_path
-    target.parent.mkdir(parents=True, exist_ok=True)
-    target.write_text(content, encoding="utf-8")
-
-
 def seed_context_repo(tmp_path: Path) -> SeededContextRepo:
     """Create a miniature repository with predictable commit history."""
 
     repo_path = tmp_path / "context_repo"
-    repo_path.mkdir(parents=True, exist_ok=True)
-
-    _run_git(repo_path, ["init", "-q"])
-    _run_git(repo_path, ["config", "user.name", "Context Bot"])
-    _run_git(repo_path, ["config", "user.email", "bot@example.com"])
 
     base_time = datetime(2024, 1, 1, 8, tzinfo=timezone.utc)
     timeline = [
@@ -103,16 +77,9 @@ def seed_context_repo(tmp_path: Path) -> SeededContextRepo:
     ]
 
     history: Dict[str, Dict[str, object]] = {}
-    adl_routes: List[Tuple[str, str]] = []
-    head_sha = ""
-
-    def _render_adl(routes: List[Tuple[str, str]]) -> str:
-        lines = ["routes:"]
-        for name, path in routes:
-            lines.append(f"  - name: {name}")
-            lines.append(f"    path: {path}")
-        lines.append("")
-        return "\n".join(lines)
+    rendered_adl = "routes:\n"
+    builder = RepoBuilder(repo_path)
+    head_sha: Optional[str] = None
 
     for entry in timeline:
         commit_time = base_time + timedelta(days=entry["offset"])
@@ -120,23 +87,17 @@ def seed_context_repo(tmp_path: Path) -> SeededContextRepo:
         entry.setdefault("files", {})
         new_route = entry.get("new_adl_route")
         if new_route:
-            adl_routes.append(new_route)
-        entry["files"]["adl.yaml"] = _render_adl(adl_routes)
-        for rel_path, contents in entry["files"].items():
-            _write(repo_path, rel_path, contents)
-
-        env = {
-            "GIT_AUTHOR_NAME": author_name,
-            "GIT_AUTHOR_EMAIL": author_email,
-            "GIT_COMMITTER_NAME": author_name,
-            "GIT_COMMITTER_EMAIL": author_email,
-            "GIT_AUTHOR_DATE": commit_time.strftime("%Y-%m-%dT%H:%M:%S+00:00"),
-            "GIT_COMMITTER_DATE": commit_time.strftime("%Y-%m-%dT%H:%M:%S+00:00"),
-        }
-
-        _run_git(repo_path, ["add", "-A"])
-        _run_git(repo_path, ["commit", "-q", "-m", entry["message"]], env=env)
-        head_sha = _run_git(repo_path, ["rev-parse", "HEAD"])
+            # Extend the rendered document rather than re-joining every route.
+            rendered_adl += f"  - name: {new_route[0]}\n    path: {new_route[1]}\n"
+        entry["files"]["adl.yaml"] = rendered_adl.encode("utf-8")
+        head_sha = builder.commit(
+            "refs/heads/main",
+            (author_name, author_email),
+            commit_time,
+            entry["message"],
+            entry["files"],
+            parent=head_sha,
+        )
 
         for rel_path in entry["files"].keys():
             if rel_path.endswith(".yaml"):
@@ -1,12 +1,12 @@
 """Fixture repository covering merge, binary, and rename scenarios."""
 from __future__ import annotations
 
-import os
-import subprocess
 from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict
+
+from .repo_builder import RepoBuilder
 
 
 @dataclass(frozen=True)
@@ -18,103 +18,93 @@ class Issue18Repo:
     commits: Dict[str, str]
 
 
-def _run_git(repo_path: Path, args: List[str], env: Dict[str, str] | None = None) -> str:
-    base_env = os.environ.copy()
-    if env:
-        base_env.update(env)
-    result = subprocess.run(
-        ["git", *args],
-        cwd=str(repo_path),
-        check=True,
-        capture_output=True,
-        text=True,
-        env=base_env,
-    )
-    return result.stdout.strip()
-
-
-def _write(repo_path: Path, rel_path: str, content: str, *, binary: bool = False) -> None:
-    target = repo_path / rel_path
-    target.parent.mkdir(parents=True, exist_ok=True)
-    if binary:
-        target.write_bytes(content.encode("latin-1"))
-    else:
-        target.write_text(content, encoding="utf-8")
-
-
 def seed_issue18_repo(tmp_path: Path) -> Issue18Repo:
     """Create a repo with merge, binary, and rename coverage."""
 
     repo_path = tmp_path / "issue18_repo"
-    repo_path.mkdir(parents=True, exist_ok=True)
+    author = ("Issue18 Bot", "issue18@example.com")
+    now = datetime.now(timezone.utc)
+    main = "refs/heads/main"
+    feature = "refs/heads/feature"
 
-    _run_git(repo_path, ["init", "-q"])
-    _run_git(repo_path, ["checkout", "-q", "-b", "main"])
-    _run_git(repo_path, ["config", "user.name", "Issue18 Bot"])
-    _run_git(repo_path, ["config", "user.email", "issue18@example.com"])
-
-    routes: List[Tuple[str, str]] = [("base", "/")]
     adl_path = "adl.yaml"
+    rendered_routes = "routes:\n"
 
-    def _render_routes() -> str:
-        lines = ["routes:"]
-        for name, path in routes:
-            lines.append(f"  - name: {name}")
-            lines.append(f"    path: {path}")
-        lines.append("")
-        return "\n".join(lines)
-
-    def _write_adl() -> None:
-        _write(repo_path, adl_path, _render_routes())
+    def _add_route(name: str, path: str) -> bytes:
+        # Append to the already-rendered document instead of re-joining every route.
+        nonlocal rendered_routes
+        rendered_routes += f"  - name: {name}\n    path: {path}\n"
+        return rendered_routes.encode("utf-8")
 
+    builder = RepoBuilder(repo_path)
     commits: Dict[str, str] = {}
 
     # Root commit
-    _write_adl()
-    _write(repo_path, "src/app.py", "print('base')\n")
-    _run_git(repo_path, ["add", "-A"])
-    _run_git(repo_path, ["commit", "-q", "-m", "seed base"])
-    commits["root"] = _run_git(repo_path, ["rev-parse", "HEAD"])
+    commits["root"] = builder.commit(
+        main,
+        author,
+        now,
+        "seed base",
+        {adl_path: _add_route("base", "/"), "src/app.py": "print('base')\n"},
+    )
 
     # Feature branch with ADL + code change
-    _run_git(repo_path, ["checkout", "-q", "-b", "feature"])
-    routes.append(("feature", "/feature"))
-    _write_adl()
-    _write(repo_path, "src/feature_only.py", "print('feature branch payload')\n")
-    _run_git(repo_path, ["add", "-A"])
-    _run_git(repo_path, ["commit", "-q", "-m", "feature adds route"])
-    commits["feature"] = _run_git(repo_path, ["rev-parse", "HEAD"])
-
-    # Return to main and prepare merge parent
-    _run_git(repo_path, ["checkout", "-q", "main"])
-    _write(repo_path, "src/main_only.py", "print('main prep change')\n")
-    _run_git(repo_path, ["add", "-A"])
-    _run_git(repo_path, ["commit", "-q", "-m", "main prep change"])
-    commits["main_pre_merge"] = _run_git(repo_path, ["rev-parse", "HEAD"])
+    feature_adl = _add_route("feature", "/feature")
+    commits["feature"] = builder.commit(
+        feature,
+        author,
+        now,
+        "feature adds route",
+        {adl_path: feature_adl, "src/feature_only.py": "print('feature branch payload')\n"},
+        parent=commits["root"],
+    )
+
+    # Back on main, prepare the merge parent
+    commits["main_pre_merge"] = builder.commit(
+        main,
+        author,
+        now,
+        "main prep change",
+        {"src/main_only.py": "print('main prep change')\n"},
+        parent=commits["root"],
+    )
 
     # Merge feature branch (first-parent diff should reflect feature changes)
-    _run_git(repo_path, ["merge", "-q", "--no-ff", "feature", "-m", "merge feature branch"])
-    commits["merge"] = _run_git(repo_path, ["rev-parse", "HEAD"])
+    commits["merge"] = builder.commit(
+        main,
+        author,
+        now,
+        "merge feature branch",
+        {adl_path: feature_adl, "src/feature_only.py": "print('feature branch payload')\n"},
+        parent=commits["main_pre_merge"],
+        merge=commits["feature"],
+    )
 
     # Binary payload commit: keep textual diff + non-UTF asset
-    routes.append(("binary", "/binary"))
-    _write_adl()
-    _write(repo_path, "src/helpers_binary.py", "print('binary guard text diff')\n")
-    (repo_path / "src").mkdir(parents=True, exist_ok=True)
-    (repo_path / "src/binary_non_utf.py").write_bytes(b"\xff\xfe\x00binary")
-    _run_git(repo_path, ["add", "-A"])
-    _run_git(repo_path, ["commit", "-q", "-m", "binary payload change"])
-    commits["binary"] = _run_git(repo_path, ["rev-parse", "HEAD"])
+    commits["binary"] = builder.commit(
+        main,
+        author,
+        now,
+        "binary payload change",
+        {
+            adl_path: _add_route("binary", "/binary"),
+            "src/helpers_binary.py": "print('binary guard text diff')\n",
+            "src/binary_non_utf.py": b"\xff\xfe\x00binary",
+        },
+        parent=commits["merge"],
+    )
 
     # Rename ADL file, ensuring rename metadata surfaces
-    _run_git(repo_path, ["mv", "adl.yaml", "decisions.yaml"])
+    commits["rename"] = builder.commit(
+        main,
+        author,
+        now,
+        "rename adl file",
+        {"decisions.yaml": _add_route("renamed", "/renamed"), "src/app.py": "print('post-rename code change')\n"},
+        parent=commits["binary"],
+        renames=[(adl_path, "decisions.yaml")],
+    )
     adl_path = "decisions.yaml"
-    routes.append(("renamed", "/renamed"))
-    _write_adl()
-    _write(repo_path, "src/app.py", "print('post-rename code change')\n")
-    _run_git(repo_path, ["add", "-A"])
-    _run_git(repo_path, ["commit", "-q", "-m", "rename adl file"])
-    commits["rename"] = _run_git(repo_path, ["rev-parse", "HEAD"])
 
     return Issue18Repo(path=repo_path, adl_current=adl_path, commits=commits)
 
@@ -1,34 +1,28 @@
 """End-to-end tests for the arch_diff_miner CLI."""
 from __future__ import annotations
 
+import contextlib
+import io
 import subprocess
+import sys
 from pathlib import Path
 
+import pytest
+
+from arch_diff_miner.cli import main
+
 from .conftest import parse_jsonl
 
 
 def run_cli(repo_path: Path, adl_file: str, extra_args: list[str] | None = None) -> list[dict]:
-    cmd = [
-        "uv",
-        "run",
-        "python",
-        "-m",
-        "arch_diff_miner",
-        "mine",
-        "--repo",
-        str(repo_path),
-        "--adl-file",
-        adl_file,
-    ]
+    argv = ["mine", "--repo", str(repo_path), "--adl-file", adl_file]
     if extra_args:
-        cmd.extend(extra_args)
-    result = subprocess.run(
-        cmd,
-        capture_output=True,
-        text=True,
-    )
-    assert result.returncode == 0, result.stderr or result.stdout
-    return parse_jsonl(result.stdout)
+        argv.extend(extra_args)
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        exit_code = main(argv)
+    assert exit_code == 0, buffer.getvalue()
+    return parse_jsonl(buffer.getvalue())
 
 
 def test_root_commit_skipped(sample_repo):
@@ -87,3 +81,23 @@ def test_adl_only_commit_filtered(sample_repo):
     records = run_cli(sample_repo["path"], sample_repo["adl_current"], extra_args=None)
     filtered_hashes = {record["commit"]["hash"] for record in records}
     assert sample_repo["commits"]["adl_only"] not in filtered_hashes
+
+
+@pytest.mark.slow
+def test_module_entrypoint_smoke(sample_repo):
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "arch_diff_miner",
+            "mine",
+            "--repo",
+            str(sample_repo["path"]),
+            "--adl-file",
+            sample_repo["adl_current"],
+        ],
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr or result.stdout
+    assert parse_jsonl(result.stdout)
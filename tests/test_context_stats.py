@@ -1,25 +1,33 @@
 """Unit tests for context statistics collection."""
 from __future__ import annotations
 
-from pathlib import Path
+from typing import Tuple
 
 import pygit2
 import pytest
 
-from arch_diff_miner.context import collect_context_stats
-from tests.fixtures.seed_context_repo import seed_context_repo
+from arch_diff_miner.context import (
+    FAST_DIFFTREE_ENV,
+    collect_context_stats,
+    make_delta_lookup,
+)
+from tests.fixtures.seed_context_repo import SeededContextRepo
 
 
-def _open_repo(path: Path) -> pygit2.Repository:
-    return pygit2.Repository(str(path / ".git"))
+SeededContext = Tuple[SeededContextRepo, pygit2.Repository, pygit2.Commit]
 
 
-def test_collect_context_stats_matches_seeded_history(tmp_path: Path) -> None:
+@pytest.fixture(scope="module")
+def seeded_context(context_template_repo: SeededContextRepo) -> SeededContext:
+    """Open the read-only seeded repo and resolve HEAD once per module."""
+    repo = pygit2.Repository(str(context_template_repo.path / ".git"))
+    return context_template_repo, repo, repo.revparse_single("HEAD")
+
+
+def test_collect_context_stats_matches_seeded_history(seeded_context: SeededContext) -> None:
     """Verify churn, authors, and recency per file and aggregate totals."""
 
-    seeded = seed_context_repo(tmp_path)
-    repo = _open_repo(seeded.path)
-    parent_commit = repo.revparse_single("HEAD")
+    seeded, repo, parent_commit = seeded_context
 
     tracked_files = list(seeded.files.keys())
     per_file, aggregate = collect_context_stats(
@@ -49,12 +57,10 @@ def test_collect_context_stats_matches_seeded_history(tmp_path: Path) -> None:
     assert aggregate["most_recent_change_days_ago"] == pytest.approx(min(freshest_days))
 
 
-def test_collect_context_stats_handles_missing_files(tmp_path: Path) -> None:
+def test_collect_context_stats_handles_missing_files(seeded_context: SeededContext) -> None:
     """Unknown files should yield zeroed stats without crashing."""
 
-    seeded = seed_context_repo(tmp_path)
-    repo = _open_repo(seeded.path)
-    parent_commit = repo.revparse_single("HEAD")
+    seeded, repo, parent_commit = seeded_context
 
     per_file, aggregate = collect_context_stats(
         repo=repo,
@@ -73,3 +79,64 @@ def test_collect_context_stats_handles_missing_files(tmp_path: Path) -> None:
     assert aggregate["total_commits"] == 0
     assert aggregate["total_unique_authors"] == 0
     assert aggregate["most_recent_change_days_ago"] == 0.0
+
+
+def test_collect_context_stats_git_log_matches_libgit2(seeded_context: SeededContext, monkeypatch) -> None:
+    """The opt-in batched `git log` path must agree with the libgit2 diff path."""
+
+    seeded, repo, parent_commit = seeded_context
+    kwargs = dict(
+        repo=repo,
+        parent_commit=parent_commit,
+        files=list(seeded.files.keys()),
+        since_dt=seeded.window_since,
+        until_dt=seeded.window_until,
+    )
+
+    expected = collect_context_stats(**kwargs)
+    monkeypatch.setenv(FAST_DIFFTREE_ENV, "1")
+    assert collect_context_stats(**kwargs) == expected
+
+
+def test_shared_delta_lookup_reuses_tree_diffs(seeded_context: SeededContext) -> None:
+    """A lookup shared across calls should serve repeat windows from cache."""
+
+    seeded, repo, parent_commit = seeded_context
+    kwargs = dict(
+        repo=repo,
+        parent_commit=parent_commit,
+        files=list(seeded.files.keys()),
+        since_dt=seeded.window_since,
+        until_dt=seeded.window_until,
+    )
+
+    expected = collect_context_stats(**kwargs)
+    lookup = make_delta_lookup(repo)
+    assert collect_context_stats(delta_lookup=lookup, **kwargs) == expected
+    misses = lookup.cache_info().misses
+    assert collect_context_stats(delta_lookup=lookup, **kwargs) == expected
+    assert lookup.cache_info().misses == misses
+
+
+def test_git_log_ignores_show_signature_config(context_repo: SeededContextRepo, monkeypatch) -> None:
+    """`log.showSignature` output must not leak into the parsed `git log` stream."""
+
+    repo = pygit2.Repository(str(context_repo.path / ".git"))
+    head = repo.revparse_single("HEAD")
+    signed_content = repo.create_commit_string(
+        head.author, head.committer, head.message, head.tree_id, head.parent_ids
+    )
+    signature = "-----BEGIN PGP SIGNATURE-----\n\niQEzBAABCAAdFiEE\n-----END PGP SIGNATURE-----"
+    signed = repo[repo.create_commit_with_signature(signed_content, signature)]
+    repo.config["log.showSignature"] = "true"
+    kwargs = dict(
+        repo=repo,
+        parent_commit=signed,
+        files=list(context_repo.files.keys()),
+        since_dt=context_repo.window_since,
+        until_dt=context_repo.window_until,
+    )
+
+    expected = collect_context_stats(**kwargs)
+    monkeypatch.setenv(FAST_DIFFTREE_ENV, "1")
+    assert collect_context_stats(**kwargs) == expected
@@ -1,23 +1,41 @@
 """Tests covering merge handling, binary diffs, and renames."""
 from __future__ import annotations
 
+import functools
 import logging
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import Any, Callable, Dict, List
 
-from arch_diff_miner.cli import MineConfig, mine_repository
-from tests.fixtures.seed_issue18_repo import seed_issue18_repo, Issue18Repo
+import pytest
 
+from arch_diff_miner.cli import MineConfig, _PatchCache, mine_repository
+from tests.fixtures import RepoBuilder
+from tests.fixtures.seed_issue18_repo import Issue18Repo
 
-def _mine_records(tmp_path: Path, adl_file: str = "adl.yaml") -> tuple[Issue18Repo, list[dict[str, object]]]:
-    repo_info = seed_issue18_repo(tmp_path)
-    config = MineConfig(
+
+MineRecords = Callable[[str], List[Dict[str, Any]]]
+
+
+def _config(repo_info: Issue18Repo, adl_file: str = "adl.yaml") -> MineConfig:
+    return MineConfig(
         repo_path=repo_info.path,
         adl_file=adl_file,
         code_extensions=(".py",),
         context_days=30,
     )
-    records = mine_repository(config)
-    return repo_info, records
+
+
+@pytest.fixture(scope="module")
+def mined_records(issue18_template_repo: Issue18Repo) -> MineRecords:
+    """Mine the shared seed once per ADL path; callers must not mutate records."""
+
+    @functools.lru_cache(maxsize=2)
+    def _mine(adl_file: str) -> List[Dict[str, Any]]:
+        return list(mine_repository(_config(issue18_template_repo, adl_file)))
+
+    return _mine
 
 
 def _record(records: list[dict[str, object]], message: str) -> dict[str, object]:
@@ -27,8 +45,10 @@ def _record(records: list[dict[str, object]], message: str) -> dict[str, object]
     raise AssertionError(f"record with message '{message}' not found")
 
 
-def test_merge_commit_uses_first_parent(tmp_path: Path) -> None:
-    repo, records = _mine_records(tmp_path)
+def test_merge_commit_uses_first_parent(
+    issue18_template_repo: Issue18Repo, mined_records: MineRecords
+) -> None:
+    repo, records = issue18_template_repo, mined_records("adl.yaml")
     merge = _record(records, "merge feature branch")
 
     assert merge["is_merge"] is True
@@ -36,9 +56,11 @@ def test_merge_commit_uses_first_parent(tmp_path: Path) -> None:
     assert {diff["path"] for diff in merge["code_diffs"]} == {"src/feature_only.py"}
 
 
-def test_binary_diff_skipped_and_logged(tmp_path: Path, caplog) -> None:
+def test_binary_diff_skipped_and_logged(
+    issue18_template_repo: Issue18Repo, mined_records: MineRecords, caplog
+) -> None:
     caplog.set_level(logging.WARNING, logger="arch_diff_miner.cli")
-    repo, records = _mine_records(tmp_path)
+    repo, records = issue18_template_repo, mined_records("adl.yaml")
     binary = _record(records, "binary payload change")
 
     assert "binary" in repo.commits
@@ -46,10 +68,106 @@ def test_binary_diff_skipped_and_logged(tmp_path: Path, caplog) -> None:
     assert {diff["path"] for diff in binary["code_diffs"]} == {"src/helpers_binary.py"}
 
 
-def test_adl_rename_previous_path(tmp_path: Path) -> None:
-    _, records = _mine_records(tmp_path, adl_file="decisions.yaml")
+def test_adl_rename_previous_path(mined_records: MineRecords) -> None:
+    records = mined_records("decisions.yaml")
     rename = _record(records, "rename adl file")
 
     adl_diff = rename["adl_diff"]
     assert adl_diff["path"] == "decisions.yaml"
     assert adl_diff["previous_path"] == "adl.yaml"
+
+
+def test_no_renames_still_follows_adl(issue18_repo: Issue18Repo, mined_records: MineRecords) -> None:
+    config = replace(_config(issue18_repo, "decisions.yaml"), detect_renames=False)
+    records = list(mine_repository(config))
+
+    expected = mined_records("decisions.yaml")
+    assert [rec["adl_diff"] for rec in records] == [rec["adl_diff"] for rec in expected]
+    assert _record(records, "rename adl file")["adl_diff"]["previous_path"] == "adl.yaml"
+
+
+def test_hunk_context_can_be_dropped(issue18_repo: Issue18Repo) -> None:
+    config = replace(_config(issue18_repo), include_hunk_context=False)
+    records = list(mine_repository(config))
+
+    assert records
+    hunks = [hunk for rec in records for hunk in rec["adl_diff"]["hunks"]]
+    hunks += [hunk for rec in records for diff in rec["code_diffs"] for hunk in diff["hunks"]]
+    assert hunks and all(hunk["context"] == [] for hunk in hunks)
+    assert all(hunk["added"] or hunk["removed"] for hunk in hunks)
+
+
+def test_parallel_workers_match_serial(issue18_repo: Issue18Repo, mined_records: MineRecords) -> None:
+    parallel = replace(_config(issue18_repo, "decisions.yaml"), workers=2)
+
+    expected = mined_records("decisions.yaml")
+    assert expected
+    assert list(mine_repository(parallel)) == expected
+
+
+def test_walk_bounds_stop_early(issue18_repo: Issue18Repo, mined_records: MineRecords) -> None:
+    config = _config(issue18_repo, "decisions.yaml")
+    expected = mined_records("decisions.yaml")
+    assert len(expected) > 1
+
+    assert list(mine_repository(replace(config, max_samples=1))) == expected[:1]
+    assert list(mine_repository(replace(config, max_samples=1, workers=2))) == expected[:1]
+    future = datetime.now(timezone.utc) + timedelta(days=1)
+    assert list(mine_repository(replace(config, since=future))) == []
+
+
+def test_unsorted_walk_matches_topological(issue18_repo: Issue18Repo, mined_records: MineRecords) -> None:
+    config = _config(issue18_repo, "decisions.yaml")
+
+    expected = list(mine_repository(replace(config, sort_order="topological")))
+    assert expected
+    assert mined_records("decisions.yaml") == expected
+
+
+def test_repeated_blob_pairs_yield_independent_records(tmp_path: Path) -> None:
+    builder = RepoBuilder(tmp_path / "repeat_repo")
+    author = ("Cache Bot", "cache@example.com")
+    when = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    head = builder.commit(
+        "refs/heads/main", author, when, "seed", {"adl.yaml": "v0\n", "src/app.py": "a\n"}
+    )
+    # app.py goes a -> b twice, so the second patch is served from the cache.
+    for step, (adl, code) in enumerate([("v1\n", "b\n"), ("v2\n", "a\n"), ("v3\n", "b\n")], 1):
+        head = builder.commit(
+            "refs/heads/main",
+            author,
+            when + timedelta(hours=step),
+            f"step {step}",
+            {"adl.yaml": adl, "src/app.py": code},
+            parent=head,
+        )
+
+    config = MineConfig(
+        repo_path=tmp_path / "repeat_repo",
+        adl_file="adl.yaml",
+        code_extensions=(".py",),
+        context_days=30,
+    )
+    records = list(mine_repository(config))
+    first, second = _record(records, "step 1"), _record(records, "step 3")
+    assert first["code_diffs"] == second["code_diffs"]
+
+    first["code_diffs"][0]["hunks"][0]["added"].append("mutated")
+    first["code_diffs"][0]["stats"]["additions"] = -1
+    assert second["code_diffs"][0]["hunks"][0]["added"] == ["b"]
+    assert second["code_diffs"][0]["stats"]["additions"] == 1
+
+
+def test_patch_cache_is_bounded_by_text_size() -> None:
+    cache = _PatchCache(max_chars=10)
+    hunk = ("@@", ("abc",), (), ())  # 5 characters
+    cache.put((b"a", b"b", "x.py", True), ((hunk,), 1, 0))
+    cache.put((b"b", b"c", "x.py", True), ((hunk,), 1, 0))
+    assert cache.get((b"a", b"b", "x.py", True)) is not None
+    cache.put((b"c", b"d", "x.py", True), ((hunk,), 1, 0))
+
+    # The least recently used entry is evicted; oversized patches are never cached.
+    assert cache.get((b"b", b"c", "x.py", True)) is None
+    assert cache.get((b"a", b"b", "x.py", True)) is not None
+    cache.put((b"d", b"e", "x.py", True), ((("@@", ("x" * 20,), (), ()),), 1, 0))
+    assert cache.get((b"d", b"e", "x.py", True)) is None
@@ -1,23 +1,32 @@
 """Verify JSONL emission includes context_signals per v2.0 schema."""
 from __future__ import annotations
 
+import io
 import json
+import threading
+import time
 from pathlib import Path
+from typing import Iterator
+
+import pytest
 
 from arch_diff_miner.cli import MineConfig, mine_repository
 from arch_diff_miner.jsonl_writer import write_jsonl_dataset
-from tests.fixtures.seed_context_repo import seed_context_repo
+from tests.fixtures.seed_context_repo import SeededContextRepo
+
+_GOLDEN_CONTEXT_SIGNALS = json.loads(
+    (Path(__file__).parent / "golden" / "context_signals_seed_repo.json").read_text(encoding="utf-8")
+)
 
 
-def _mine_single_record(tmp_path: Path) -> dict[str, object]:
-    repo_info = seed_context_repo(tmp_path)
+def _mine_single_record(repo_info: SeededContextRepo, tmp_path: Path) -> dict[str, object]:
     config = MineConfig(
         repo_path=repo_info.path,
         adl_file="adl.yaml",
         code_extensions=(".py",),
         context_days=30,
     )
-    samples = mine_repository(config)
+    samples = list(mine_repository(config))
     assert samples, "seeded repo should yield at least one training pair"
 
     output_path = tmp_path / "dataset.jsonl"
@@ -28,20 +37,79 @@ def _mine_single_record(tmp_path: Path) -> dict[str, object]:
     return json.loads(line)
 
 
-def test_context_signals_matches_golden(tmp_path: Path) -> None:
-    record = _mine_single_record(tmp_path)
+def test_context_signals_matches_golden(context_repo: SeededContextRepo, tmp_path: Path) -> None:
+    record = _mine_single_record(context_repo, tmp_path)
     context_signals = record.get("context_signals")
     assert context_signals, "context_signals block must be present in v2.0 output"
 
-    golden_path = Path(__file__).parent / "golden" / "context_signals_seed_repo.json"
-    golden = json.loads(golden_path.read_text(encoding="utf-8"))
+    golden = _GOLDEN_CONTEXT_SIGNALS
 
     # Dynamic hash only needs to be a string; everything else should match the schema.
     assert isinstance(context_signals.get("analysis_parent_hash"), str)
     assert context_signals.get("analysis_timespan_days") == golden["analysis_timespan_days"]
     assert context_signals.get("files_analyzed") == golden["files_analyzed"]
-    assert context_signals.get("aggregate_stats") == golden["aggregate_stats"]
-    assert context_signals.get("per_file_stats") == golden["per_file_stats"]
+    # Recency values are floats: compare those leaves with approx, the rest exactly.
+    assert context_signals.get("aggregate_stats") == pytest.approx(golden["aggregate_stats"])
+    per_file = context_signals.get("per_file_stats")
+    assert [entry["path"] for entry in per_file] == [entry["path"] for entry in golden["per_file_stats"]]
+    for actual, expected in zip(per_file, golden["per_file_stats"]):
+        assert actual["last_modified_days_ago"] == pytest.approx(expected["last_modified_days_ago"])
+        assert {**actual, "last_modified_days_ago": None} == {**expected, "last_modified_days_ago": None}
 
     assert record.get("metadata", {}).get("dataset_version") == "adl-diff-miner-schema-v2.0"
     assert "context_stats" not in record
+
+
+def test_writer_thread_preserves_sample_order(tmp_path: Path) -> None:
+    hunk = {"header": "@@ -1 +1 @@", "added": ["x"], "removed": [], "context": []}
+    samples = (
+        {
+            "commit_hash": f"{idx:040x}",
+            "adl_diff": {"path": "adl.yaml", "hunks": [hunk]},
+            "code_diffs": [{"path": "src/app.py", "hunks": [hunk]}],
+        }
+        for idx in range(200)
+    )
+
+    output_path = tmp_path / "ordered.jsonl"
+    written = write_jsonl_dataset(samples, output_path)
+
+    lines = output_path.read_text(encoding="utf-8").splitlines()
+    assert written == len(lines) == 200
+    assert [json.loads(line)["commit"]["hash"] for line in lines] == [
+        f"{idx:040x}" for idx in range(200)
+    ]
+
+
+def test_writer_failure_stops_sample_pulls(monkeypatch) -> None:
+    failed = threading.Event()
+
+    class _FailingBuffer(io.BytesIO):
+        def write(self, data: bytes) -> int:
+            failed.set()
+            raise OSError("disk full")
+
+    class _Stdout(io.StringIO):
+        buffer = _FailingBuffer()
+
+    monkeypatch.setattr("sys.stdout", _Stdout())
+    hunk = {"header": "@@ -1 +1 @@", "added": ["x"], "removed": [], "context": []}
+    pulled = 0
+
+    def _samples() -> Iterator[dict[str, object]]:
+        nonlocal pulled
+        for idx in range(500):
+            if idx:
+                # Give the writer thread time to die on the first record.
+                failed.wait(timeout=5)
+                time.sleep(0.05)
+            pulled += 1
+            yield {
+                "commit_hash": f"{idx:040x}",
+                "adl_diff": {"path": "adl.yaml", "hunks": [hunk]},
+                "code_diffs": [{"path": "src/app.py", "hunks": [hunk]}],
+            }
+
+    with pytest.raises(OSError, match="disk full"):
+        write_jsonl_dataset(_samples(), None)
+    assert pulled == 2